@@ -0,0 +1,55 @@
+"""comment article_id indexes
+
+Revision ID: 9355a3ea3575
+Revises: 47b98279061d
+Create Date: 2026-10-18 09:12:44.730215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9355a3ea3575'
+down_revision: Union[str, Sequence[str], None] = '47b98279061d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индексы строятся без блокировки записи в таблицу коментариев
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_comment_article_id_id',
+            'comment',
+            ['article_id', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.create_index(
+            'ix_comment_article_id_score_id',
+            'comment',
+            ['article_id', sa.text('score DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_comment_article_id_score_id',
+            table_name='comment',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+        op.drop_index(
+            'ix_comment_article_id_id',
+            table_name='comment',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -0,0 +1,58 @@
+"""article comment stats columns
+
+Revision ID: b3fcc8479610
+Revises: 9355a3ea3575
+Create Date: 2026-10-18 10:03:27.165402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3fcc8479610'
+down_revision: Union[str, Sequence[str], None] = '9355a3ea3575'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('article', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('article', sa.Column('score_sum', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('article', sa.Column('score_histogram', postgresql.ARRAY(sa.Integer()), server_default='{0,0,0,0,0,0}', nullable=False))
+    op.execute(
+        '''
+        UPDATE article
+        SET comment_count = stats.comment_count,
+            score_sum = stats.score_sum,
+            score_histogram = stats.score_histogram
+        FROM (
+            SELECT
+                article_id,
+                count(*)::int AS comment_count,
+                sum(score) AS score_sum,
+                ARRAY[
+                    (count(*) FILTER (WHERE score = 0))::int,
+                    (count(*) FILTER (WHERE score = 1))::int,
+                    (count(*) FILTER (WHERE score = 2))::int,
+                    (count(*) FILTER (WHERE score = 3))::int,
+                    (count(*) FILTER (WHERE score = 4))::int,
+                    (count(*) FILTER (WHERE score = 5))::int
+                ] AS score_histogram
+            FROM comment
+            GROUP BY article_id
+        ) AS stats
+        WHERE article.id = stats.article_id
+        '''
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('article', 'score_histogram')
+    op.drop_column('article', 'score_sum')
+    op.drop_column('article', 'comment_count')
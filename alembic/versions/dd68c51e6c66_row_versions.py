@@ -0,0 +1,65 @@
+"""row versions for change feed
+
+Revision ID: dd68c51e6c66
+Revises: b3fcc8479610
+Create Date: 2026-10-18 12:41:09.517204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dd68c51e6c66'
+down_revision: Union[str, Sequence[str], None] = 'b3fcc8479610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('article', 'comment'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+        op.add_column(table, sa.Column('version', sa.BigInteger(), server_default=sa.text('pg_current_xact_id()::text::bigint'), nullable=False))
+        op.create_index(f'ix_{table}_version_id', table, ['version', 'id'], unique=False)
+
+    op.execute(
+        '''
+        CREATE FUNCTION set_row_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.version := pg_current_xact_id()::text::bigint;
+            NEW.updated_at := now();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        '''
+    )
+    # Счетчики коментариев статьи не меняют ее содержимое,
+    # поэтому версия статьи растет только при изменении title или text
+    op.execute(
+        '''
+        CREATE TRIGGER article_set_row_version
+        BEFORE UPDATE OF title, text ON article
+        FOR EACH ROW EXECUTE FUNCTION set_row_version()
+        '''
+    )
+    op.execute(
+        '''
+        CREATE TRIGGER comment_set_row_version
+        BEFORE UPDATE ON comment
+        FOR EACH ROW EXECUTE FUNCTION set_row_version()
+        '''
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS comment_set_row_version ON comment')
+    op.execute('DROP TRIGGER IF EXISTS article_set_row_version ON article')
+    op.execute('DROP FUNCTION IF EXISTS set_row_version()')
+    for table in ('comment', 'article'):
+        op.drop_index(f'ix_{table}_version_id', table_name=table)
+        op.drop_column(table, 'version')
+        op.drop_column(table, 'updated_at')
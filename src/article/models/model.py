@@ -1,14 +1,44 @@
-from base.model import BaseModel
+from base.model import ROW_VERSION_DEFAULT, BaseModel
+from datetime import datetime
+from sqlalchemy import (
+    BigInteger, DateTime, FetchedValue, Index, Integer, func
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from article.schemas.schema import ArticleSchema, ArticleSimpleSchema
 from comment.models.model import CommentModel
 
+# Количество значений оценки коментария (от 0 до 5 включительно)
+SCORE_HISTOGRAM_SIZE = 6
+
 
 class ArticleModel(BaseModel):
     __tablename__ = 'article'
+    __table_args__ = (
+        Index('ix_article_version_id', 'version', 'id'),
+    )
     title: Mapped[str] = mapped_column()
     text: Mapped[str] = mapped_column()
 
+    # Статистика коментариев, обновляемая вместе с коментариями
+    comment_count: Mapped[int] = mapped_column(server_default='0')
+    score_sum: Mapped[int] = mapped_column(BigInteger, server_default='0')
+    score_histogram: Mapped[list[int]] = mapped_column(
+        ARRAY(Integer, zero_indexes=True),
+        server_default='{' + ','.join(['0'] * SCORE_HISTOGRAM_SIZE) + '}'
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        server_onupdate=FetchedValue()
+    )
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        server_default=ROW_VERSION_DEFAULT,
+        server_onupdate=FetchedValue()
+    )
+
     comments: Mapped[list['CommentModel']] = relationship(
         back_populates='article',
         lazy='selectin',
@@ -33,7 +63,11 @@ class ArticleModel(BaseModel):
             return cls(
                 id=schema.id,
                 title=schema.title,
-                text=schema.text
+                text=schema.text,
+                comments=[
+                    CommentModel.from_schema(comment)
+                    for comment in schema.comments
+                ]
             )
         else:
             return cls(
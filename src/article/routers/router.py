@@ -1,10 +1,71 @@
-from fastapi import APIRouter, Depends
-from article.schemas.schema import ArticleSchema, ArticleSimpleSchema
+from typing import Any
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from article.schemas.schema import (
+    ArticlePartialSchema, ArticleSchema, ArticleSimpleSchema,
+    ArticleStatsSchema, ArticleSummarySchema
+)
+from base.schema import PageSchema
+from base.pagination import (
+    DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, Page, parse_fields, parse_ids
+)
 from article.services.service import ArticleService
-from dependencies.services import article_service
+from dependencies.services import (
+    article_read_service, article_service, comment_read_service
+)
+from comment.schemas.schema import CommentSchema
+from comment.services.service import CommentService, CommentSort
 from article.models.model import ArticleModel
+from base.bulk import MAX_BULK_SIZE, BulkResult, validate_many
+from storage.local_cache import LocalCacheStats
+from storage.cache import digest
+from base.http import (
+    accepts_encoding, conditional_response, is_not_modified, make_etag,
+    not_modified_response, set_cache_headers
+)
+from metrics.timing import TimedRoute
 
-router = APIRouter(prefix='/articles', tags=['Статьи'])
+router = APIRouter(
+    prefix='/articles',
+    tags=['Статьи'],
+    route_class=TimedRoute
+)
+
+
+async def cached_article_response(
+    article_id: int,
+    request: Request,
+    service: ArticleService
+) -> Response:
+    '''
+    Ответ с JSON статьи из кэша и ETag по его хэшу. Если ETag из \
+        `If-None-Match` совпадает с хэшем в кэше, возвращается \
+            `304 Not Modified` без обращения к БД и чтения статьи
+
+    Args:
+        article_id (int): ID статьи
+        request (Request): Запрос
+        service (ArticleService): Бизнес-логика статей
+
+    Returns:
+        Response: Ответ с JSON статьи или `304 Not Modified`
+    '''
+    cached_digest = await service.get_cached_digest(article_id)
+    if cached_digest is not None:
+        etag = make_etag(cached_digest)
+        if is_not_modified(request.headers.get('if-none-match'), etag):
+            return not_modified_response(etag)
+        if accepts_encoding(request.headers.get('accept-encoding'), 'gzip'):
+            compressed = await service.get_cached_gzip(article_id)
+            if compressed is not None:
+                return conditional_response(
+                    request,
+                    compressed,
+                    cached_digest,
+                    content_encoding='gzip'
+                )
+    body = await service.get_cached_json(article_id)
+    return conditional_response(request, body, digest(body))
 
 
 @router.post(
@@ -20,51 +81,239 @@ async def create_article(
     return await service.create(ArticleModel.from_schema(schema))
 
 
+@router.post(
+    path='/bulk',
+    summary='Массовое создание статей',
+    description='Массовое создание статей. Каждый элемент проверяется '
+    'отдельно: ошибки одних элементов не отменяют создание остальных',
+    response_model=BulkResult
+)
+async def create_articles_bulk(
+    items: list[Any] = Body(max_length=MAX_BULK_SIZE),
+    service: ArticleService = Depends(article_service)
+):
+    schemas, errors = validate_many(ArticleSimpleSchema, items)
+    result = await service.create_many({
+        index: ArticleModel.from_schema(schema)
+        for index, schema in schemas.items()
+    })
+    result.errors = sorted(
+        result.errors + errors,
+        key=lambda error: error.index
+    )
+    return result
+
+
+@router.get(
+    path='/export',
+    summary='Выгрузка всех статей в NDJSON',
+    description='Потоковая выгрузка всех статей без коментариев '
+    'в формате NDJSON: по одному JSON-объекту на строку в порядке ID',
+    response_class=StreamingResponse
+)
+async def export_articles(
+    service: ArticleService = Depends(article_service)
+):
+    return StreamingResponse(
+        service.export(),
+        media_type='application/x-ndjson'
+    )
+
+
+@router.get(
+    path='/cached/stats',
+    summary='Счетчики локального кэша статей',
+    description='Счетчики локального кэша статей обработавшего запрос '
+    'воркера: попадания, промахи, вытеснения',
+    response_model=LocalCacheStats
+)
+async def get_cached_articles_stats(
+    service: ArticleService = Depends(article_service)
+):
+    return service.get_cache_stats()
+
+
 @router.get(
     path='/cached/{article_id}',
     summary='Получение кешированной статьи по ее ID',
-    description='Получение кешированной статьи по ее ID',
+    description='Получение кешированной статьи по ее ID. Если ETag из '
+    '`If-None-Match` совпадает с текущим, возвращается '
+    '`304 Not Modified` без обращения к БД и чтения статьи. '
+    'Клиентам с `Accept-Encoding: gzip` отдается сжатый при записи '
+    'в кэш вариант',
     response_model=ArticleSchema
 )
 async def get_cached_article(
     article_id: int,
+    request: Request,
     service: ArticleService = Depends(article_service)
 ):
-    return await service.get_cached(article_id)
+    return await cached_article_response(article_id, request, service)
 
 
 @router.get(
     path='/trending',
+    summary='Получение популярных статей',
+    description='Получение популярных статей по рейтингу, учитывающему '
+    'количество коментариев, их среднюю оценку и давность',
+    response_model=list[ArticleSchema]
+)
+async def get_article_trending(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    service: ArticleService = Depends(article_read_service)
+):
+    return await service.get_trending(limit)
+
+
+@router.get(
+    path='/random',
     summary='Получение случайной статьи',
-    description='Получение случайной статьи',
-    response_model=ArticleSchema
+    description='Получение случайной статьи. '
+    'Если передан параметр `n`, возвращается список из `n` различных '
+    'случайных статей',
+    response_model=ArticleSchema | list[ArticleSchema]
 )
-async def get_article_tranding(
-    service: ArticleService = Depends(article_service)
+async def get_article_random(
+    n: int | None = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    service: ArticleService = Depends(article_read_service)
+):
+    if n is None:
+        return await service.get_random_one()
+    return await service.get_random(n)
+
+
+@router.get(
+    path='/summary',
+    summary='Получение кратких представлений статей постранично',
+    description='Получение статей постранично без текста и коментариев, '
+    'с количеством коментариев и их средней оценкой. '
+    'Для получения следующей страницы передайте `next_cursor` '
+    'в параметр `after`',
+    response_model=PageSchema[ArticleSummarySchema]
+)
+async def get_articles_summary(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = Query(None, description='Курсор следующей страницы'),
+    with_total: bool = Query(
+        False,
+        description='Добавить приблизительное количество статей'
+    ),
+    service: ArticleService = Depends(article_read_service)
+):
+    return await service.get_summary_page(limit, after, with_total)
+
+
+@router.get(
+    path='/{article_id}/comments',
+    summary='Получение коментариев статьи постранично',
+    description='Получение коментариев статьи постранично '
+    '(keyset-пагинация). `sort=id` - по возрастанию ID, `sort=score` - '
+    'по убыванию оценки. Для получения следующей страницы передайте '
+    '`next_cursor` в параметр `after` с тем же `sort`',
+    response_model=PageSchema[CommentSchema]
+)
+async def get_article_comments(
+    article_id: int,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = Query(None, description='Курсор следующей страницы'),
+    sort: CommentSort = Query('id', description='Порядок коментариев'),
+    service: CommentService = Depends(comment_read_service)
+):
+    return await service.get_article_page(article_id, limit, after, sort)
+
+
+@router.get(
+    path='/{article_id}/stats',
+    summary='Получение статистики коментариев статьи',
+    description='Получение количества коментариев статьи, их средней '
+    'оценки и количества коментариев по каждой оценке',
+    response_model=ArticleStatsSchema
+)
+async def get_article_stats(
+    article_id: int,
+    service: ArticleService = Depends(article_read_service)
 ):
-    return await service.get_tranding()
+    return await service.get_comment_stats(article_id)
 
 
 @router.get(
     path='/{article_id}',
     summary='Получение статьи по ее ID',
-    description='Получение статьи по ее ID',
-    response_model=ArticleSchema
+    description='Получение статьи по ее ID. Если передан параметр '
+    '`fields`, возвращаются только перечисленные поля. Если ETag из '
+    '`If-None-Match` совпадает с текущим, возвращается '
+    '`304 Not Modified` без чтения статьи',
+    response_model=ArticleSchema | ArticlePartialSchema,
+    response_model_exclude_unset=True
 )
 async def get_article(
     article_id: int,
-    service: ArticleService = Depends(article_service)
+    request: Request,
+    response: Response,
+    fields: str | None = Query(
+        None,
+        description='Поля через запятую, например `id,title`'
+    ),
+    service: ArticleService = Depends(article_read_service)
 ):
-    return await service.get({"id": article_id})
+    if fields is None:
+        return await cached_article_response(article_id, request, service)
+    field_names = parse_fields(fields)
+    validator = await service.get_validator(article_id, field_names)
+    if validator is not None:
+        etag = make_etag(validator)
+        if is_not_modified(request.headers.get('if-none-match'), etag):
+            return not_modified_response(etag)
+        set_cache_headers(response, etag)
+    return await service.get_fields({"id": article_id}, field_names)
 
 
 @router.get(
     path='/',
-    summary='Получение всех статей',
-    description='Получение всех статей',
-    response_model=list[ArticleSchema]
+    summary='Получение статей постранично',
+    description='Получение статей постранично (keyset-пагинация по ID). '
+    'Для получения следующей страницы передайте `next_cursor` '
+    'в параметр `after`. Если передан параметр `ids`, возвращаются '
+    'статьи с этими ID в порядке запроса. Если передан параметр '
+    '`fields`, возвращаются только перечисленные поля',
+    response_model=PageSchema[ArticleSchema | ArticlePartialSchema],
+    response_model_exclude_unset=True
 )
 async def get_all_articles(
-    service: ArticleService = Depends(article_service)
+    ids: str | None = Query(
+        None,
+        description='ID через запятую, например `1,2,3`'
+    ),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = Query(None, description='Курсор следующей страницы'),
+    with_total: bool = Query(
+        False,
+        description='Добавить приблизительное количество статей'
+    ),
+    fields: str | None = Query(
+        None,
+        description='Поля через запятую, например `id,title`'
+    ),
+    service: ArticleService = Depends(article_read_service)
 ):
-    return await service.get_all()
+    field_names = parse_fields(fields) if fields is not None else None
+    if ids is not None and field_names is not None:
+        return Page(items=await service.get_fields_by_ids(
+            parse_ids(ids),
+            field_names
+        ))
+    if ids is not None:
+        items = await service.get_cached_many_json(parse_ids(ids))
+        return Response(
+            '{"items":[' + ','.join(items) + '],'
+            '"next_cursor":null,"total":null}',
+            media_type='application/json'
+        )
+    if field_names is not None:
+        return await service.get_fields_page(
+            limit,
+            field_names,
+            after,
+            with_total
+        )
+    return await service.get_page(limit, after, with_total)
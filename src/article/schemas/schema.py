@@ -1,3 +1,4 @@
+from datetime import datetime
 from base.schema import BaseSchema, BaseSimpleSchema
 from comment.schemas.schema import CommentSchema
 
@@ -26,3 +27,91 @@ class ArticleSchema(ArticleSimpleSchema, BaseSchema):
     '''
     comments: list[CommentSchema]
     pass
+
+
+class ArticlePartialSchema(BaseSimpleSchema):
+    '''
+    Pydantic-схема статьи с выбранными через `fields` полями. \
+        Невыбранные поля не попадают в ответ
+
+    Args:
+        id (int | None): ID
+        title (str | None): Название статьи
+        text (str | None): Содержимое статьи
+        comment_count (int | None): Количество коментариев
+        score_sum (int | None): Сумма оценок коментариев
+        score_histogram (list[int] | None): Количество коментариев \
+            по каждой оценке от 0 до 5
+        updated_at (datetime | None): Дата и время последнего изменения
+        version (int | None): Версия статьи
+    '''
+    id: int | None = None
+    title: str | None = None
+    text: str | None = None
+    comment_count: int | None = None
+    score_sum: int | None = None
+    score_histogram: list[int] | None = None
+    updated_at: datetime | None = None
+    version: int | None = None
+
+
+class ArticleSummarySchema(BaseSchema):
+    '''
+    Краткая Pydantic-схема статьи для списков, без текста и коментариев
+
+    Args:
+        id (int): ID
+        title (str): Название статьи
+        comment_count (int): Количество коментариев
+        avg_score (float | None): Средняя оценка коментариев, \
+            `None` - коментариев нет
+    '''
+    title: str
+    comment_count: int
+    avg_score: float | None
+
+
+class ArticleStatsSchema(BaseSimpleSchema):
+    '''
+    Pydantic-схема статистики коментариев статьи
+
+    Args:
+        comment_count (int): Количество коментариев
+        score_sum (int): Сумма оценок коментариев
+        avg_score (float | None): Средняя оценка коментариев, \
+            `None` - коментариев нет
+        score_histogram (list[int]): Количество коментариев \
+            по каждой оценке от 0 до 5
+    '''
+    comment_count: int
+    score_sum: int
+    avg_score: float | None
+    score_histogram: list[int]
+
+
+class ArticleExportSchema(ArticleSimpleSchema, BaseSchema):
+    '''
+    Pydantic-схема статьи для выгрузки, без коментариев. \
+        Коментарии выгружаются отдельно
+
+    Args:
+        id (int): ID
+        title (str): Название статьи
+        text (str): Содержимое статьи
+    '''
+    pass
+
+
+class ArticleChangeSchema(ArticleExportSchema):
+    '''
+    Pydantic-схема измененной статьи для ленты изменений
+
+    Args:
+        id (int): ID
+        title (str): Название статьи
+        text (str): Содержимое статьи
+        updated_at (datetime): Дата и время последнего изменения
+        version (int): Версия статьи
+    '''
+    updated_at: datetime
+    version: int
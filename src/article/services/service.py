@@ -1,11 +1,22 @@
 from base.service import BaseService
-from article.models.model import ArticleModel
+from base.pagination import Page, encode_cursor
+from article.models.model import ArticleModel, SCORE_HISTOGRAM_SIZE
+from comment.models.model import CommentModel
 from article.repositories.repository import ArticleRepository
 from sqlalchemy.ext.asyncio import AsyncSession
-from exceptions.exception import AlreadyExistsError, NotFoundError
-import random
+from exceptions.exception import NotFoundError
 from redis.asyncio import Redis
-from article.schemas.schema import ArticleSchema
+from article.schemas.schema import ArticleExportSchema, ArticleSchema
+from article.services.trending import TrendingService
+from storage.cache import RedisCache, digest
+from storage.local_cache import LocalCacheStats
+from db.database import after_commit, async_session
+from typing import Any, AsyncGenerator, cast
+from sqlalchemy import (
+    Float, Integer, Table, bindparam, func, or_, select, update
+)
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.orm import lazyload
 
 
 class ArticleService(BaseService[ArticleModel]):
@@ -16,13 +27,16 @@ class ArticleService(BaseService[ArticleModel]):
     def __init__(
         self,
         db: AsyncSession,
-        redis_service: Redis
+        redis_service: Redis,
+        trending_service: TrendingService
     ) -> None:
         '''
         Бизнес-логика для статей
 
         Args:
             db (AsyncSession): Асинхронная сессия БД
+            redis_service (Redis): Клиент Redis
+            trending_service (TrendingService): Рейтинг популярных статей
         '''
         super().__init__(
             ArticleRepository(db),
@@ -30,6 +44,8 @@ class ArticleService(BaseService[ArticleModel]):
             model_name='article'
         )
         self.redis_service = redis_service
+        self.trending_service = trending_service
+        self.cache = RedisCache(redis_service, self.model_name)
 
     async def create(self, model: ArticleModel) -> ArticleModel:
         '''
@@ -37,101 +53,475 @@ class ArticleService(BaseService[ArticleModel]):
 
         Args:
             model (ArticleModel): SQLAlchemy-модель статьи
+
+        Raises:
+            AlreadyExistsError: Статья с таким ID уже существует
         '''
-        filter = {"id": model.id}
-        exists = await self.exists(filter)
-        if exists:
-            raise AlreadyExistsError(self.model_name, filter)
         return await super().create(model)
 
-    async def get_tranding(self) -> ArticleModel:
+    async def update(self, model: ArticleModel) -> ArticleModel | None:
+        '''
+        Обновление статьи со сбросом ее кэша
+
+        Args:
+            model (ArticleModel): SQLAlchemy-модель статьи
+
+        Returns:
+            ArticleModel | None: SQLAlchemy-модель обновленной статьи
+        '''
+        updated = await super().update(model)
+        self.invalidate_cache(model.id)
+        return updated
+
+    async def delete(self, filter: dict[str, Any]) -> None:
+        '''
+        Удаление статей по фильтру со сбросом их кэша
+
+        Args:
+            filter (dict[str, Any]): Фильтр поиска сущности в БД. \
+                `{"Название_атрибута": Значение_атрибута}`
+
+        Raises:
+            NotFoundError: Не удалось найти сущность по фильтру
+        '''
+        models = await self.get_multiple(filter)
+        await super().delete(filter)
+        for model in models:
+            self.invalidate_cache(model.id)
+
+    async def get_trending(self, limit: int) -> list[ArticleModel]:
+        '''
+        Получение самых популярных статей по рейтингу из Redis
+
+        Args:
+            limit (int): Количество статей
+
+        Returns:
+            list[ArticleModel]: SQLAlchemy-модели статей \
+                по убыванию рейтинга
+        '''
+        ids = await self.trending_service.get_top_ids(limit)
+        return await self.get_by_ids(ids)
+
+    async def get_summary_page(
+        self,
+        limit: int,
+        after: str | None = None,
+        with_total: bool = False
+    ) -> Page[dict[str, Any]]:
+        '''
+        Постраничный поиск кратких представлений статей с количеством \
+            коментариев и средней оценкой. Агрегаты берутся из счетчиков \
+                статьи, тексты статей и коментариев не читаются
+
+        Args:
+            limit (int): Максимальное количество статей на странице
+            after (str | None, optional): Курсор, полученный вместе с \
+                предыдущей страницей. Defaults to None.
+            with_total (bool, optional): Добавить приблизительное \
+                количество статей из статистики Postgres. \
+                    Defaults to False.
+
+        Raises:
+            BadRequestError: Некорректный курсор
+
+        Returns:
+            Page[dict[str, Any]]: Страница кратких представлений статей
+        '''
+        statement = select(
+            ArticleModel.id,
+            ArticleModel.title,
+            ArticleModel.comment_count,
+            (
+                ArticleModel.score_sum.cast(Float)
+                / func.nullif(ArticleModel.comment_count, 0)
+            ).label('avg_score')
+        )
+        if after is not None:
+            statement = statement.where(
+                ArticleModel.id > self._decode_id_cursor(after)
+            )
+        statement = statement.order_by(ArticleModel.id).limit(limit + 1)
+
+        rows = await self.repository.mappings_all(statement)
+        page = Page(items=rows[:limit])
+        if len(rows) > limit:
+            page.next_cursor = encode_cursor(page.items[-1]['id'])
+        if with_total:
+            page.total = await self.repository.approximate_count(
+                ArticleModel.__tablename__
+            )
+        return page
+
+    def export(self) -> AsyncGenerator[bytes, None]:
+        '''
+        Потоковая выгрузка всех статей в NDJSON без коментариев
+
+        Returns:
+            AsyncGenerator[bytes, None]: Строки NDJSON
+        '''
+        return self.export_ndjson(
+            ArticleExportSchema,
+            [lazyload(ArticleModel.comments)]
+        )
+
+    async def get_comment_stats(self, id: int) -> dict[str, Any]:
+        '''
+        Получение статистики коментариев статьи из ее счетчиков
+
+        Args:
+            id (int): ID статьи
+
+        Raises:
+            NotFoundError: Статья не найдена
+
+        Returns:
+            dict[str, Any]: Количество коментариев, сумма и средняя \
+                оценка, количество коментариев по каждой оценке
+        '''
+        stats = await self.get_fields(
+            {'id': id},
+            ['comment_count', 'score_sum', 'score_histogram']
+        )
+        stats['avg_score'] = (
+            stats['score_sum'] / stats['comment_count']
+            if stats['comment_count'] else None
+        )
+        return stats
+
+    async def update_comment_stats(
+        self,
+        added: list[tuple[int, int]] = [],
+        removed: list[tuple[int, int]] = []
+    ) -> None:
+        '''
+        Обновление счетчиков коментариев статей в текущей транзакции. \
+            Изменения суммируются по статьям и применяются одним пакетом \
+                `UPDATE` в порядке ID статей, чтобы одновременные \
+                    транзакции блокировали строки в одном порядке
+
+        Args:
+            added (list[tuple[int, int]], optional): ID статьи и оценка \
+                каждого добавленного коментария. Defaults to [].
+            removed (list[tuple[int, int]], optional): ID статьи и оценка \
+                каждого удаленного коментария. Defaults to [].
+        '''
+        deltas: dict[int, list[int]] = {}
+        for sign, comments in ((1, added), (-1, removed)):
+            for article_id, score in comments:
+                delta = deltas.setdefault(
+                    article_id,
+                    [0] * (2 + SCORE_HISTOGRAM_SIZE)
+                )
+                delta[0] += sign
+                delta[1] += sign * score
+                delta[2 + score] += sign
+
+        params = [
+            {
+                'delta_id': article_id,
+                'delta_count': delta[0],
+                'delta_sum': delta[1],
+                **{
+                    f'delta_score_{score}': delta[2 + score]
+                    for score in range(SCORE_HISTOGRAM_SIZE)
+                }
+            }
+            for article_id, delta in sorted(deltas.items())
+            if any(delta)
+        ]
+        article = cast(Table, ArticleModel.__table__)
+        histogram = article.c.score_histogram
+        statement = update(article).where(
+            article.c.id == bindparam('delta_id')
+        ).values({
+            article.c.comment_count: (
+                article.c.comment_count + bindparam('delta_count')
+            ),
+            article.c.score_sum: article.c.score_sum + bindparam('delta_sum'),
+            **{
+                histogram[score]: (
+                    histogram[score] + bindparam(f'delta_score_{score}')
+                )
+                for score in range(SCORE_HISTOGRAM_SIZE)
+            }
+        })
+        await self.repository.execute_update(statement, params)
+
+    async def reconcile_comment_stats(self, batch_size: int = 10000) -> int:
+        '''
+        Пересчет счетчиков коментариев статей по таблице коментариев. \
+            Статьи обрабатываются диапазонами ID по `batch_size`, каждый \
+                диапазон фиксируется отдельной транзакцией. Обновляются \
+                    только статьи, счетчики которых разошлись с данными. \
+                        Статьи диапазона блокируются до подсчета
+
+        Args:
+            batch_size (int, optional): Количество ID статей в одной \
+                транзакции. Defaults to 10000.
+
+        Returns:
+            int: Количество исправленных статей
+        '''
+        article = cast(Table, ArticleModel.__table__)
+        comment = CommentModel.__table__
+        stats_article = article.alias('stats_article')
+        max_id = await self.repository.scalar_one(
+            select(func.max(article.c.id))
+        )
+
+        fixed = 0
+        for first_id in range(1, (max_id or 0) + 1, batch_size):
+            last_id = first_id + batch_size - 1
+            # Счетчики считаются следующим запросом после блокировки: его
+            # снимок видит коментарии транзакций, которые уже изменили
+            # счетчики статьи, а остальные транзакции ждут блокировку.
+            # Подзапрос в самом UPDATE считался бы на снимке до ожидания
+            # блокировки и затер бы приращения этих транзакций
+            await self.repository.db.execute(
+                select(article.c.id)
+                .where(article.c.id.between(first_id, last_id))
+                .order_by(article.c.id)
+                .with_for_update()
+            )
+            stats = select(
+                stats_article.c.id,
+                func.count(comment.c.id).cast(Integer).label('comment_count'),
+                func.coalesce(func.sum(comment.c.score), 0).label(
+                    'score_sum'
+                ),
+                array([
+                    func.count(comment.c.id).filter(
+                        comment.c.score == score
+                    ).cast(Integer)
+                    for score in range(SCORE_HISTOGRAM_SIZE)
+                ]).label('score_histogram')
+            ).select_from(stats_article.outerjoin(
+                comment,
+                comment.c.article_id == stats_article.c.id
+            )).where(
+                stats_article.c.id.between(first_id, last_id)
+            ).group_by(stats_article.c.id).subquery('stats')
+
+            statement = update(article).where(
+                article.c.id == stats.c.id,
+                or_(
+                    article.c.comment_count != stats.c.comment_count,
+                    article.c.score_sum != stats.c.score_sum,
+                    article.c.score_histogram != stats.c.score_histogram
+                )
+            ).values(
+                comment_count=stats.c.comment_count,
+                score_sum=stats.c.score_sum,
+                score_histogram=stats.c.score_histogram
+            )
+            fixed += await self.repository.execute_update(statement)
+            await self.repository.db.commit()
+        return fixed
+
+    async def get_random_one(self) -> ArticleModel:
         '''
         Получение случайной статьи
 
         Returns:
             ArticleModel: SQLAlchemy-модель случайной статьи
         '''
-        models = await self.get_all()
+        models = await self.get_random()
         if not models:
             raise NotFoundError(self.model_name)
-        return random.choice(models)
+        return models[0]
 
-    async def get_cached(self, id: int) -> ArticleModel:
+    async def get_cached_json(self, id: int) -> str:
         '''
-        Получение кешированной статьи из Redis
+        Получение JSON кешированной статьи из Redis в том виде, в котором \
+            он хранится в кэше, без разбора и повторной сериализации. \
+                При промахе статья загружается из БД одним запросом \
+                    на все воркеры
 
         Args:
             id (int): ID статьи
 
+        Raises:
+            NotFoundError: Статья не найдена
+
         Returns:
-            ArticleModel: SQLAlchemy-модель найденой статьи
+            str: JSON статьи по схеме `ArticleSchema`
+        '''
+        return await self.cache.get_or_load(
+            self.__get_key(id),
+            loader=lambda: self.__load_primary_json(id),
+            refresher=lambda: self.__load_primary_json(id)
+        )
+
+    async def get_cached_digest(self, id: int) -> str | None:
         '''
+        Получение хэша JSON кешированной статьи без чтения самой статьи. \
+            Используется для ответа `304 Not Modified`
 
-        try:
-            model = await self.__get_from_cache(id)
-        except NotFoundError:
-            print(f'Cached {self.model_name} not found')
-            filter = {'id': id}
-            model = await self.get(filter)
-            await self.__cache(model, expire_time_seconds=30)
-        return model
+        Args:
+            id (int): ID статьи
 
-    async def __get_from_cache(self, id: int) -> ArticleModel:
+        Returns:
+            str | None: Хэш JSON статьи или `None`, если статьи нет в кэше
         '''
-        Получает из Redis кэшированные данные о SQLAlchemy-модели
+        return await self.cache.get_digest(self.__get_key(id))
+
+    async def get_validator(self, id: int, fields: list[str]) -> str | None:
+        '''
+        Хэш версии статьи и счетчиков ее коментариев для ETag ответа \
+            с выбранными полями. Текст статьи не читается. Версия статьи \
+                не меняется при изменении коментариев, поэтому в хэш \
+                    входят и счетчики
 
         Args:
-            id (int): ID SQLAlchemy-модели
+            id (int): ID статьи
+            fields (list[str]): Поля ответа
 
         Returns:
-            ArticleModel: SQLAlchemy-модель
+            str | None: Хэш версии или `None`, если статьи нет
+        '''
+        row = await self.repository.mappings_one_or_none(
+            select(
+                ArticleModel.version,
+                ArticleModel.comment_count,
+                ArticleModel.score_sum,
+                ArticleModel.score_histogram
+            ).where(ArticleModel.id == id)
+        )
+        if row is None:
+            return None
+        return digest(
+            f'{id}:{",".join(map(str, row.values()))}:{",".join(fields)}'
+        )
 
-        Raises:
-            NotFoundError: Не удалось найти
+    async def get_cached_gzip(self, id: int) -> bytes | None:
         '''
-        raw = await self.redis_service.get(self.__get_key(id))
-        if raw:
-            schema = ArticleSchema.model_validate_json(raw)
-            model = ArticleModel.from_schema(schema)
-            return model
-        raise NotFoundError(self.model_name, {'id': id})
+        Получение сжатого gzip JSON кешированной статьи, сжатого один раз \
+            при записи в кэш
 
-    async def __delete_from_cache(self, id: int) -> None:
+        Args:
+            id (int): ID статьи
+
+        Returns:
+            bytes | None: Сжатый JSON статьи или `None`, если статьи нет \
+                в кэше или она слишком маленькая для сжатия
         '''
-        Удаление из Redis кэшированных данных
+        return await self.cache.get_compressed(self.__get_key(id))
+
+    async def get_cached_many_json(self, ids: list[int]) -> list[str]:
+        '''
+        Получение JSON нескольких кешированных статей без разбора. \
+            Найденные в Redis статьи читаются одним `MGET`, остальные \
+                загружаются из БД одним запросом и кэшируются одним пакетом
 
         Args:
-            id (int): ID SQLAlchemy-модели
+            ids (list[int]): ID статей
 
-        Raises:
-            NotFoundError: Не удалось найти
+        Returns:
+            list[str]: JSON статей по схеме `ArticleSchema` в порядке \
+                `ids`. Ненайденные статьи пропускаются
         '''
-        await self.redis_service.delete(self.__get_key(id))
+        keys = {self.__get_key(id): id for id in ids}
+
+        async def load(missing_keys: list[str]) -> dict[str, str]:
+            async with async_session() as session:
+                models = await ArticleService(
+                    session,
+                    self.redis_service,
+                    self.trending_service
+                ).get_by_ids([keys[key] for key in missing_keys])
+            return {
+                self.__get_key(model.id):
+                    ArticleSchema.model_validate(model).model_dump_json()
+                for model in models
+            }
+
+        values = await self.cache.get_many_or_load(list(keys), load)
+        return [
+            values[key]
+            for key in map(self.__get_key, ids)
+            if key in values
+        ]
 
-    async def __cache(
+    async def prime_cache(
         self,
-        model: ArticleModel,
-        expire_time_seconds: int = 0
+        ids: list[int],
+        batch_size: int = 1000
     ) -> None:
         '''
-        Кеширует данные о SQLAlchemy-модели в Redis
+        Заполнение кэша статьями пачками по `batch_size`. Уже \
+            закэшированные версии статей предварительно сбрасываются, \
+                так как могли устареть
 
         Args:
-            model (ArticleModel): SQLAlchemy-модель
-            expire_time_seconds (int): Время жизни кэша в Redis. \
-                Если `expire_time_seconds <= 0`, то время жизни бесконечно
+            ids (list[int]): ID статей
+            batch_size (int, optional): Количество статей в одной пачке. \
+                Defaults to 1000.
+        '''
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            await self.cache.invalidate_many(list(map(self.__get_key, batch)))
+            await self.get_cached_many_json(batch)
+
+    async def __load_json(self, id: int) -> str:
         '''
-        key = self.__get_key(model.id)
-        schema = ArticleSchema.model_validate(model)
-        json_data = schema.model_dump_json()
-        if expire_time_seconds > 0:
-            await self.redis_service.set(
-                key,
-                json_data,
-                ex=expire_time_seconds
+        Загрузка статьи из БД для кэша
+
+        Args:
+            id (int): ID статьи
+
+        Raises:
+            NotFoundError: Статья не найдена
+
+        Returns:
+            str: JSON статьи
+        '''
+        model = await self.get({'id': id})
+        return ArticleSchema.model_validate(model).model_dump_json()
+
+    async def __load_primary_json(self, id: int) -> str:
+        '''
+        Загрузка статьи для кэша из основной БД в собственной сессии. \
+            Сессия запроса может быть открыта на отстающей реплике, \
+                а при фоновом обновлении - уже закрыта
+
+        Args:
+            id (int): ID статьи
+
+        Returns:
+            str: JSON статьи
+        '''
+        async with async_session() as session:
+            service = ArticleService(
+                session,
+                self.redis_service,
+                self.trending_service
             )
-        else:
-            await self.redis_service.set(key, json_data)
+            return await service.__load_json(id)
+
+    def invalidate_cache(self, id: int) -> None:
+        '''
+        Сброс кэша статьи в Redis и в локальных кэшах всех воркеров \
+            после фиксации текущей транзакции. Вызывается при любом \
+                изменении статьи или ее коментариев
+
+        Args:
+            id (int): ID статьи
+        '''
+        key = self.__get_key(id)
+        after_commit(
+            self.repository.db,
+            lambda: self.cache.invalidate(key)
+        )
+
+    def get_cache_stats(self) -> LocalCacheStats:
+        '''
+        Счетчики локального кэша статей этого воркера
+
+        Returns:
+            LocalCacheStats: Счетчики локального кэша
+        '''
+        return self.cache.local_cache.stats()
 
     def __get_key(self, id: int) -> str:
         '''
@@ -0,0 +1,211 @@
+import math
+from datetime import datetime, timezone
+from redis.asyncio import Redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from comment.models.model import CommentModel
+from config import settings
+from storage.redis import pipeline
+
+# Начало отсчета времени для рейтинга. Чем меньше число секунд от него,
+# тем выше точность float-значений в sorted set
+_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+
+# Атомарно обновляет статистику статьи и ее рейтинг в sorted set.
+# Формула рейтинга должна совпадать с `TrendingService._rank`
+_REGISTER_COMMENT_SCRIPT = '''
+local count = redis.call('HINCRBY', KEYS[2], 'count', 1)
+local score_sum = redis.call('HINCRBY', KEYS[2], 'score_sum', ARGV[2])
+local last_activity = math.max(
+    tonumber(redis.call('HGET', KEYS[2], 'last_activity') or 0),
+    tonumber(ARGV[3])
+)
+redis.call('HSET', KEYS[2], 'last_activity', last_activity)
+local rank = math.log10(1 + count)
+    + tonumber(ARGV[5]) * score_sum / count / 5
+    + last_activity / tonumber(ARGV[4])
+redis.call('ZADD', KEYS[1], rank, ARGV[1])
+return tostring(rank)
+'''
+
+
+class TrendingService:
+    '''
+    Рейтинг популярных статей в Redis sorted set.
+
+    Рейтинг статьи складывается из логарифма количества коментариев, \
+        средней оценки коментариев и времени последнего коментария. \
+            Время входит в рейтинг слагаемым, поэтому старые статьи \
+                опускаются вниз без периодического пересчета всего набора
+    '''
+
+    key = 'trending:article'
+    stats_key_prefix = 'trending:article:stats'
+
+    _rebuild_batch_size = 1000
+
+    def __init__(self, redis_service: Redis) -> None:
+        '''
+        Рейтинг популярных статей в Redis sorted set
+
+        Args:
+            redis_service (Redis): Клиент Redis
+        '''
+        self.redis_service = redis_service
+        self.__register_comment = redis_service.register_script(
+            _REGISTER_COMMENT_SCRIPT
+        )
+        self.__decay_seconds = settings.trending.trending_decay_seconds
+        self.__score_weight = settings.trending.trending_score_weight
+
+    async def register_comment(
+        self,
+        article_id: int,
+        score: int,
+        created_at: datetime | None = None
+    ) -> None:
+        '''
+        Учитывает новый коментарий в рейтинге статьи
+
+        Args:
+            article_id (int): ID статьи
+            score (int): Оценка коментария
+            created_at (datetime | None, optional): Время создания \
+                коментария. Defaults to None - текущее время.
+        '''
+        created_at = created_at or datetime.now(timezone.utc)
+        await self.__register_comment(
+            keys=[self.key, self.__get_stats_key(article_id)],
+            args=[
+                article_id,
+                score,
+                created_at.timestamp() - _EPOCH,
+                self.__decay_seconds,
+                self.__score_weight
+            ]
+        )
+
+    async def register_comments(
+        self,
+        comments: list[tuple[int, int]]
+    ) -> None:
+        '''
+        Учитывает несколько новых коментариев за один сетевой вызов
+
+        Args:
+            comments (list[tuple[int, int]]): Пары \
+                `(ID статьи, оценка коментария)`
+        '''
+        if not comments:
+            return
+        created_at = datetime.now(timezone.utc).timestamp() - _EPOCH
+        async with pipeline(self.redis_service) as pipe:
+            for article_id, score in comments:
+                await self.__register_comment(
+                    keys=[self.key, self.__get_stats_key(article_id)],
+                    args=[
+                        article_id,
+                        score,
+                        created_at,
+                        self.__decay_seconds,
+                        self.__score_weight
+                    ],
+                    client=pipe
+                )
+
+    async def get_top_ids(self, limit: int) -> list[int]:
+        '''
+        Получение ID самых популярных статей
+
+        Args:
+            limit (int): Количество статей
+
+        Returns:
+            list[int]: ID статей по убыванию рейтинга
+        '''
+        ids = await self.redis_service.zrevrange(self.key, 0, limit - 1)
+        return [int(id) for id in ids]
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        '''
+        Пересчитывает рейтинг всех статей по коментариям из БД. \
+            Новый sorted set собирается пачками под временным ключом \
+                и атомарно подменяет старый
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+
+        Returns:
+            int: Количество статей в рейтинге
+        '''
+        statement = select(
+            CommentModel.article_id,
+            func.count(CommentModel.id),
+            func.sum(CommentModel.score),
+            func.max(CommentModel.created_at)
+        ).group_by(CommentModel.article_id)
+        rows = (await db.execute(statement)).all()
+
+        tmp_key = f'{self.key}:rebuild'
+        await self.redis_service.delete(tmp_key)
+        for start in range(0, len(rows), self._rebuild_batch_size):
+            batch = rows[start:start + self._rebuild_batch_size]
+            async with pipeline(self.redis_service) as pipe:
+                for article_id, count, score_sum, last_activity in batch:
+                    last_activity_seconds = (
+                        last_activity.timestamp() - _EPOCH
+                    )
+                    pipe.hset(self.__get_stats_key(article_id), mapping={
+                        'count': count,
+                        'score_sum': score_sum,
+                        'last_activity': last_activity_seconds
+                    })
+                    pipe.zadd(tmp_key, {
+                        str(article_id): self._rank(
+                            count,
+                            score_sum,
+                            last_activity_seconds
+                        )
+                    })
+
+        if rows:
+            await self.redis_service.rename(tmp_key, self.key)
+        else:
+            await self.redis_service.delete(self.key)
+        return len(rows)
+
+    def _rank(
+        self,
+        count: int,
+        score_sum: int,
+        last_activity_seconds: float
+    ) -> float:
+        '''
+        Рейтинг статьи
+
+        Args:
+            count (int): Количество коментариев
+            score_sum (int): Сумма оценок коментариев
+            last_activity_seconds (float): Время последнего коментария \
+                в секундах от `_EPOCH`
+
+        Returns:
+            float: Рейтинг статьи
+        '''
+        return (
+            math.log10(1 + count)
+            + self.__score_weight * score_sum / count / 5
+            + last_activity_seconds / self.__decay_seconds
+        )
+
+    def __get_stats_key(self, article_id: int) -> str:
+        '''
+        Получение ключа статистики статьи для Redis
+
+        Args:
+            article_id (int): ID статьи
+
+        Returns:
+            str: Ключ вида `trending:article:stats:id`
+        '''
+        return f'{self.stats_key_prefix}:{article_id}'
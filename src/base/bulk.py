@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+from typing import Any
+from pydantic import ValidationError
+from base.schema import BaseSimpleSchema
+
+MAX_BULK_SIZE = 1000
+
+
+@dataclass
+class BulkCreated:
+    '''
+    Созданная при массовом создании сущность
+
+    Args:
+        index (int): Индекс сущности в запросе
+        id (int): ID созданной сущности
+    '''
+    index: int
+    id: int
+
+
+@dataclass
+class BulkError:
+    '''
+    Ошибка создания сущности при массовом создании
+
+    Args:
+        index (int): Индекс сущности в запросе
+        detail (Any): Описание ошибки
+    '''
+    index: int
+    detail: Any
+
+
+@dataclass
+class BulkResult:
+    '''
+    Результат массового создания сущностей
+
+    Args:
+        created (list[BulkCreated]): Созданные сущности
+        errors (list[BulkError]): Ошибки по сущностям, \
+            которые не удалось создать
+    '''
+    created: list[BulkCreated] = field(default_factory=list)
+    errors: list[BulkError] = field(default_factory=list)
+
+
+def validate_many[S: BaseSimpleSchema](
+    schema_class: type[S],
+    items: list[Any]
+) -> tuple[dict[int, S], list[BulkError]]:
+    '''
+    Валидирует каждую сущность запроса отдельно, чтобы ошибки одних \
+        сущностей не отменяли создание остальных
+
+    Args:
+        schema_class (type[S]): Класс Pydantic-схемы сущности
+        items (list[Any]): Сущности из тела запроса
+
+    Returns:
+        tuple[dict[int, S], list[BulkError]]: Валидные схемы по индексам \
+            в запросе и ошибки валидации остальных сущностей
+    '''
+    schemas: dict[int, S] = {}
+    errors: list[BulkError] = []
+    for index, item in enumerate(items):
+        try:
+            schemas[index] = schema_class.model_validate(item)
+        except ValidationError as e:
+            errors.append(BulkError(
+                index,
+                e.errors(include_url=False, include_context=False)
+            ))
+    return schemas, errors
@@ -0,0 +1,187 @@
+from fastapi import Request, Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+
+
+def make_etag(digest: str) -> str:
+    '''
+    Сильный ETag по хэшу тела ответа или версии сущности
+
+    Args:
+        digest (str): Хэш тела ответа или версии сущности
+
+    Returns:
+        str: Значение заголовка `ETag`
+    '''
+    return f'"{digest}"'
+
+
+def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+    '''
+    Проверка, что копия клиента из `If-None-Match` совпадает с текущей
+
+    Args:
+        if_none_match (str | None): Значение заголовка `If-None-Match`
+        etag (str): Текущий ETag
+
+    Returns:
+        bool: `True` - можно ответить `304 Not Modified`
+    '''
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # Для If-None-Match используется слабое сравнение (RFC 9110)
+    return etag in (
+        tag.strip().removeprefix('W/') for tag in if_none_match.split(',')
+    )
+
+
+def accepts_encoding(accept_encoding: str | None, coding: str) -> bool:
+    '''
+    Проверка, что клиент принимает ответ в кодировке `coding`
+
+    Args:
+        accept_encoding (str | None): Значение заголовка `Accept-Encoding`
+        coding (str): Кодировка, например `gzip`
+
+    Returns:
+        bool: `True` - кодировка указана в заголовке (или через `*`) \
+            с ненулевым весом
+    '''
+    if not accept_encoding:
+        return False
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        if name.strip().lower() not in (coding, '*'):
+            continue
+        weight = params.strip().removeprefix('q=')
+        try:
+            return not params or float(weight) > 0
+        except ValueError:
+            return False
+    return False
+
+
+def cache_control() -> str:
+    '''
+    Значение заголовка `Cache-Control` для GET-ответов из настроек
+
+    Returns:
+        str: Значение заголовка `Cache-Control`
+    '''
+    directives = [
+        'public',
+        f'max-age={settings.http_cache.http_cache_max_age}'
+    ]
+    if settings.http_cache.http_cache_s_maxage > 0:
+        directives.append(
+            f's-maxage={settings.http_cache.http_cache_s_maxage}'
+        )
+    if settings.http_cache.http_cache_stale_while_revalidate > 0:
+        directives.append(
+            'stale-while-revalidate='
+            f'{settings.http_cache.http_cache_stale_while_revalidate}'
+        )
+    return ', '.join(directives)
+
+
+def not_modified_response(etag: str) -> Response:
+    '''
+    Ответ `304 Not Modified` без тела
+
+    Args:
+        etag (str): Текущий ETag
+
+    Returns:
+        Response: Ответ `304 Not Modified`
+    '''
+    return Response(
+        status_code=304,
+        headers={'ETag': etag, 'Cache-Control': cache_control()}
+    )
+
+
+def conditional_response(
+    request: Request,
+    body: str | bytes,
+    digest: str,
+    media_type: str = 'application/json',
+    content_encoding: str | None = None
+) -> Response:
+    '''
+    Ответ с готовым телом и ETag или `304 Not Modified`, если копия \
+        клиента актуальна
+
+    Args:
+        request (Request): Запрос
+        body (str | bytes): Тело ответа
+        digest (str): Хэш несжатого тела ответа
+        media_type (str, optional): Тип тела ответа. \
+            Defaults to 'application/json'.
+        content_encoding (str | None, optional): Кодировка уже сжатого \
+            тела, например `gzip`. Defaults to None.
+
+    Returns:
+        Response: Ответ
+    '''
+    etag = make_etag(digest)
+    if is_not_modified(request.headers.get('if-none-match'), etag):
+        return not_modified_response(etag)
+    headers = {
+        'ETag': etag,
+        'Cache-Control': cache_control(),
+        'Vary': 'Accept-Encoding'
+    }
+    if content_encoding is not None:
+        # Сжатое тело отличается побайтно, но совпадает по содержимому,
+        # поэтому ETag становится слабым
+        headers['ETag'] = f'W/{etag}'
+        headers['Content-Encoding'] = content_encoding
+    return Response(body, media_type=media_type, headers=headers)
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    '''
+    Добавляет ETag и `Cache-Control` к ответу маршрута, которому \
+        FastAPI сериализует тело сам
+
+    Args:
+        response (Response): Ответ маршрута
+        etag (str): Текущий ETag
+    '''
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = cache_control()
+
+
+class WeakETagMiddleware:
+    '''
+    Делает ETag слабым у ответов, сжатых после его вычисления, \
+        например `GZipMiddleware`: сжатое тело отличается побайтно \
+            от несжатого, по которому считался сильный ETag.
+
+    Должен стоять снаружи сжимающего middleware
+    '''
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_weak_etag(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                etag = headers.get('etag')
+                if (
+                    etag is not None
+                    and not etag.startswith('W/')
+                    and 'content-encoding' in headers
+                ):
+                    headers['ETag'] = f'W/{etag}'
+            await send(message)
+
+        await self.app(scope, receive, send_with_weak_etag)
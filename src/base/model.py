@@ -1,7 +1,12 @@
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, text
 from sqlalchemy.orm import Mapped, mapped_column
 
+# Версия строки - ID транзакции, которая ее записала. Версия растет
+# вместе с ID транзакций, при изменении строки ее и `updated_at`
+# обновляет триггер `set_row_version` (см. миграцию dd68c51e6c66)
+ROW_VERSION_DEFAULT = text('pg_current_xact_id()::text::bigint')
+
 
 class BaseModel(DeclarativeBase):
     '''
@@ -0,0 +1,112 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import Any
+from exceptions.exception import BadRequestError
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+MAX_IDS = MAX_PAGE_LIMIT
+# ID хранятся в INTEGER, большие значения из курсора Postgres не примет
+MAX_ID = 2 ** 31 - 1
+
+
+@dataclass
+class Page[M]:
+    '''
+    Страница результатов keyset-пагинации
+
+    Args:
+        items (list[M]): Сущности на странице
+        next_cursor (str | None): Курсор следующей страницы или `None`, \
+            если страница последняя
+        total (int | None): Приблизительное количество сущностей в таблице \
+            или `None`, если оно не запрашивалось
+    '''
+    items: list[M] = field(default_factory=list)
+    next_cursor: str | None = None
+    total: int | None = None
+
+
+def encode_cursor(value: Any) -> str:
+    '''
+    Кодирует позицию keyset-пагинации в непрозрачный курсор
+
+    Args:
+        value (Any): JSON-сериализуемая позиция (например, ID последней \
+            сущности на странице)
+
+    Returns:
+        str: Курсор в виде URL-safe base64 строки
+    '''
+    raw = json.dumps(value, separators=(',', ':')).encode('utf8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Any:
+    '''
+    Декодирует курсор, полученный из `encode_cursor`
+
+    Args:
+        cursor (str): Курсор
+
+    Raises:
+        BadRequestError: Некорректный курсор
+
+    Returns:
+        Any: Позиция keyset-пагинации
+    '''
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(cursor + padding)
+        return json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise BadRequestError(f'Некорректный курсор "{cursor}"')
+
+
+def parse_ids(raw: str) -> list[int]:
+    '''
+    Разбирает список ID через запятую (`1,2,3`)
+
+    Args:
+        raw (str): Список ID через запятую
+
+    Raises:
+        BadRequestError: Некорректный список ID или в нем больше \
+            `MAX_IDS` элементов
+
+    Returns:
+        list[int]: Список ID в исходном порядке
+    '''
+    try:
+        ids = [int(id) for id in raw.split(',') if id.strip()]
+    except ValueError:
+        raise BadRequestError(f'Некорректный список ID "{raw}"')
+    if not ids or len(ids) > MAX_IDS or min(ids) < 1:
+        raise BadRequestError(
+            f'Список ID должен содержать от 1 до {MAX_IDS} '
+            'положительных чисел'
+        )
+    return ids
+
+
+def parse_fields(raw: str) -> list[str]:
+    '''
+    Разбирает список полей через запятую (`id,title`)
+
+    Args:
+        raw (str): Список полей через запятую
+
+    Raises:
+        BadRequestError: Пустой список полей
+
+    Returns:
+        list[str]: Названия полей без повторов в исходном порядке
+    '''
+    fields = list(dict.fromkeys(
+        field.strip() for field in raw.split(',') if field.strip()
+    ))
+    if not fields:
+        raise BadRequestError('Список полей не может быть пустым')
+    return fields
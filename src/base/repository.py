@@ -1,7 +1,15 @@
-from typing import TypeVar, Sequence
-from sqlalchemy import ScalarResult, Select, Delete
+from typing import Any, TypeVar, Sequence, cast
+from sqlalchemy import (
+    CursorResult, ScalarResult, Select, Delete, Table, Update, insert,
+    inspect, select, text
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from base.model import BaseModel
+from exceptions.exception import AlreadyExistsError, NotFoundError
+
+FOREIGN_KEY_VIOLATION = '23503'
+UNIQUE_VIOLATION = '23505'
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -77,20 +85,138 @@ class BaseRepository[T: BaseModel]:
         '''
         return (await self.db.execute(statement)).scalars().unique()
 
+    async def exists(self, statement: Select) -> bool:
+        '''
+        Проверяет, что `statement` находит хотя бы одну строку, \
+            запросом `SELECT EXISTS (...)` без загрузки сущностей
+
+        Args:
+            statement (Select): Запрос в БД
+
+        Returns:
+            bool: `True` - строка найдена, `False` - не найдена
+        '''
+        return bool(
+            (await self.db.execute(select(statement.exists()))).scalar()
+        )
+
+    async def scalar_one(self, statement: Select) -> Any:
+        '''
+        Возвращает единственное значение результата `statement` \
+            (например, `COUNT(*)`)
+
+        Args:
+            statement (Select): Запрос в БД
+
+        Returns:
+            Any: Значение из БД
+        '''
+        return (await self.db.execute(statement)).scalar_one()
+
+    async def mappings_all(
+        self,
+        statement: Select
+    ) -> list[dict[str, Any]]:
+        '''
+        Возвращает все строки результата `statement` в виде словарей \
+            без создания SQLAlchemy-моделей
+
+        Args:
+            statement (Select): Запрос в БД по отдельным колонкам
+
+        Returns:
+            list[dict[str, Any]]: Значения колонок по их названиям
+        '''
+        result = await self.db.execute(statement)
+        return [dict(row) for row in result.mappings()]
+
+    async def mappings_one_or_none(
+        self,
+        statement: Select
+    ) -> dict[str, Any] | None:
+        '''
+        Возвращает одну строку результата `statement` в виде словаря \
+            или `None`, если строка не найдена
+
+        Args:
+            statement (Select): Запрос в БД по отдельным колонкам
+
+        Returns:
+            dict[str, Any] | None: Значения колонок по их названиям \
+                или `None`
+        '''
+        row = (await self.db.execute(statement)).mappings().one_or_none()
+        return dict(row) if row is not None else None
+
+    async def approximate_count(self, table_name: str) -> int:
+        '''
+        Возвращает приблизительное количество строк в таблице по \
+            статистике планировщика Postgres (`pg_class.reltuples`) \
+                вместо полного `COUNT(*)`
+
+        Args:
+            table_name (str): Название таблицы
+
+        Returns:
+            int: Приблизительное количество строк, `0` - если таблица \
+                еще ни разу не анализировалась
+        '''
+        statement = text(
+            'SELECT greatest(reltuples, 0)::bigint FROM pg_class '
+            'WHERE oid = to_regclass(:table_name)'
+        )
+        result = await self.db.execute(statement, {'table_name': table_name})
+        return result.scalar_one_or_none() or 0
+
     async def create(self, model: T) -> T:
         '''
-        Добавление сущности в БД
+        Добавление сущности в БД одним `INSERT ... RETURNING` без \
+            дополнительных запросов на проверку и перечитывание сущности
 
         Args:
             model (T): SQLAlchemy-модель сущности
 
+        Raises:
+            NotFoundError: Не найдена сущность, на которую ссылается \
+                внешний ключ
+            AlreadyExistsError: Сущность с такими уникальными \
+                значениями уже существует
+
         Returns:
             T: Сущность, с обновленными данными из БД
         '''
-        self.db.add(model)
-        await self.db.flush()
-        await self.db.refresh(model)
-        return model
+        model_class = type(model)
+        values = self._get_column_values(model)
+        statement = insert(model_class).values(**values).returning(
+            *model_class.__table__.columns
+        )
+        try:
+            row = (await self.db.execute(statement)).one()
+        except IntegrityError as e:
+            raise self._translate_integrity_error(e, model_class, values)
+        return model_class(**row._mapping)
+
+    async def create_many(self, models: list[T]) -> list[int]:
+        '''
+        Добавление нескольких сущностей в БД многострочными \
+            `INSERT ... RETURNING id` без загрузки созданных сущностей
+
+        Args:
+            models (list[T]): SQLAlchemy-модели сущностей одного класса
+
+        Returns:
+            list[int]: ID созданных сущностей в порядке `models`
+        '''
+        if not models:
+            return []
+        model_class = type(models[0])
+        values = [self._get_column_values(model) for model in models]
+        statement = insert(model_class).returning(
+            getattr(model_class, 'id'),
+            sort_by_parameter_order=True
+        )
+        result = await self.db.execute(statement, values)
+        return list(result.scalars().all())
 
     async def update(
         self,
@@ -114,6 +240,109 @@ class BaseRepository[T: BaseModel]:
         await self.db.refresh(merged)
         return merged
 
+    def _get_column_values(self, model: T) -> dict[str, Any]:
+        '''
+        Значения колонок, заданные в SQLAlchemy-модели. Незаданные \
+            колонки не попадают в `INSERT` и получают значения по умолчанию
+
+        Args:
+            model (T): SQLAlchemy-модель сущности
+
+        Returns:
+            dict[str, Any]: Значения по названиям колонок
+        '''
+        return {
+            attr.key: model.__dict__[attr.key]
+            for attr in inspect(type(model)).column_attrs
+            if model.__dict__.get(attr.key) is not None
+        }
+
+    def _translate_integrity_error(
+        self,
+        error: IntegrityError,
+        model_class: type[T],
+        values: dict[str, Any]
+    ) -> Exception:
+        '''
+        Преобразует нарушение ограничения БД в ошибку API
+
+        Args:
+            error (IntegrityError): Ошибка БД
+            model_class (type[T]): Класс SQLAlchemy-модели сущности
+            values (dict[str, Any]): Значения колонок сущности
+
+        Returns:
+            Exception: `NotFoundError` для нарушения внешнего ключа, \
+                `AlreadyExistsError` для нарушения уникальности, \
+                    иначе исходная ошибка
+        '''
+        sqlstate = getattr(error.orig, 'sqlstate', None)
+        constraint_name = getattr(
+            getattr(error.orig, '__cause__', None),
+            'constraint_name',
+            None
+        )
+        table = model_class.__table__
+        if not isinstance(table, Table):
+            return error
+
+        if sqlstate == FOREIGN_KEY_VIOLATION:
+            # Внешний ключ из ошибки, а если его имя не совпало
+            # с метаданными модели - первый внешний ключ таблицы
+            foreign_keys = sorted(
+                table.foreign_keys,
+                key=lambda fk: (
+                    fk.constraint is None
+                    or fk.constraint.name != constraint_name
+                )
+            )
+            if foreign_keys:
+                foreign_key = foreign_keys[0]
+                referred_table = foreign_key.column.table
+                if isinstance(referred_table, Table):
+                    return NotFoundError(
+                        referred_table.name,
+                        {foreign_key.column.name: values.get(
+                            foreign_key.parent.name
+                        )}
+                    )
+
+        if sqlstate == UNIQUE_VIOLATION:
+            filter = {
+                column.name: values[column.name]
+                for column in table.primary_key
+                if column.name in values
+            }
+            return AlreadyExistsError(table.name, filter)
+
+        return error
+
+    async def execute_update(
+        self,
+        statement: Update,
+        params: list[dict[str, Any]] | None = None
+    ) -> int:
+        '''
+        Выполнение `UPDATE` без загрузки сущностей. Если переданы \
+            параметры, запрос выполняется пакетом по одному набору \
+                параметров на строку
+
+        Args:
+            statement (Update): Стейтмент обновления строк таблицы
+            params (list[dict[str, Any]] | None, optional): Наборы \
+                параметров для `bindparam` стейтмента. Defaults to None.
+
+        Returns:
+            int: Количество обновленных строк
+        '''
+        if params is not None and not params:
+            return 0
+        result = cast(
+            CursorResult[Any],
+            await self.db.execute(statement, params)
+        )
+        return result.rowcount
+
     async def delete(self, statement: Delete) -> None:
         '''
         Удаление сущности из БД
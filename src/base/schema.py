@@ -21,3 +21,20 @@ class BaseSchema(BaseSimpleSchema):
     '''
 
     id: int = Field(gt=0, description="ID")
+
+
+class PageSchema[S](BaseSimpleSchema):
+    '''
+    Pydantic-схема страницы keyset-пагинации
+
+    Args:
+        items (list[S]): Сущности на странице
+        next_cursor (str | None): Курсор следующей страницы, \
+            `None` - страница последняя
+        total (int | None): Приблизительное количество сущностей, \
+            если оно было запрошено
+    '''
+
+    items: list[S]
+    next_cursor: str | None = None
+    total: int | None = None
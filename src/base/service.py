@@ -1,10 +1,16 @@
-from typing import TypeVar, Any
+from typing import AsyncGenerator, TypeVar, Any
+import random
 from base.model import BaseModel
 from base.repository import BaseRepository
 from sqlalchemy.orm.strategy_options import _AttrType
-from sqlalchemy import Select, delete, select
+from sqlalchemy import Integer, Select, delete, func, select
 from sqlalchemy.orm import selectinload
-from exceptions.exception import NotFoundError
+from sqlalchemy.orm.interfaces import LoaderOption
+from db.replicas import open_read_session
+from base.schema import BaseSimpleSchema
+from exceptions.exception import BadRequestError, NotFoundError
+from base.pagination import MAX_ID, Page, decode_cursor, encode_cursor
+from base.bulk import BulkCreated, BulkResult
 
 M = TypeVar("M", bound=BaseModel)
 
@@ -22,6 +28,12 @@ class BaseService[M]:
         '{"Название_атрибута": Значение_атрибута}'
     )
 
+    _random_oversampling = 3
+
+    _random_attempts = 3
+
+    _export_chunk_size = 1000
+
     model_class: type[M]
 
     def __init__(
@@ -54,6 +66,22 @@ class BaseService[M]:
         '''
         return await self.repository.create(model)
 
+    async def create_many(self, models: dict[int, M]) -> BulkResult:
+        '''
+        Массовое создание сущностей в БД
+
+        Args:
+            models (dict[int, M]): SQLAlchemy-модели сущностей \
+                по их индексам в запросе
+
+        Returns:
+            BulkResult: ID созданных сущностей по индексам в запросе
+        '''
+        ids = await self.repository.create_many(list(models.values()))
+        return BulkResult(created=[
+            BulkCreated(index, id) for index, id in zip(models, ids)
+        ])
+
     async def get(
         self,
         filter: dict[str, Any],
@@ -109,21 +137,106 @@ class BaseService[M]:
         await self.repository.db.flush()
         return list(models)
 
-    async def exists(
+    async def get_by_ids(
         self,
-        filter: dict[str, Any],
+        ids: list[int],
         model_attrs: list[_AttrType] = []
-    ) -> bool:
+    ) -> list[M]:
         '''
-        Проверка на существование сущности по фильтру
+        Поиск сущностей по списку ID одним запросом
 
         Args:
-            filter (dict[str, Any]): Фильтр поиска сущности в БД. \
-                `{"Название_атрибута": Значение_атрибута}`
+            ids (list[int]): Список ID
             model_attrs (list[_AttrType], optional): Дополнительно \
                 подгружаемые сложные аттрибуты SQLAlchemy модели. \
                     Defaults to [].
 
+        Returns:
+            list[M]: Найденные сущности в порядке `ids`. Ненайденные ID \
+                пропускаются
+        '''
+        if not ids:
+            return []
+        id_column = getattr(self.model_class, 'id')
+        statement = self._add_model_attrs_to_statement(
+            select(self.model_class),
+            model_attrs
+        )
+        models = await self.repository.scalars_all(
+            statement.where(id_column.in_(ids))
+        )
+        await self.repository.db.flush()
+        models_by_id = {getattr(model, 'id'): model for model in models}
+        return [models_by_id[id] for id in ids if id in models_by_id]
+
+    async def get_fields_by_ids(
+        self,
+        ids: list[int],
+        fields: list[str]
+    ) -> list[dict[str, Any]]:
+        '''
+        Поиск сущностей по списку ID одним запросом с выборкой только \
+            указанных колонок. SQLAlchemy-модели не загружаются
+
+        Args:
+            ids (list[int]): Список ID
+            fields (list[str]): Названия колонок
+
+        Raises:
+            BadRequestError: Неизвестное название колонки
+
+        Returns:
+            list[dict[str, Any]]: Значения колонок сущностей в порядке \
+                `ids`. Ненайденные ID пропускаются
+        '''
+        if not ids:
+            return []
+        id_column = getattr(self.model_class, 'id')
+        rows = await self.repository.mappings_all(
+            select(*self._get_columns(fields)).where(id_column.in_(ids))
+        )
+        rows_by_id = {row['id']: row for row in rows}
+        return [rows_by_id[id] for id in ids if id in rows_by_id]
+
+    async def get_existing_ids(
+        self,
+        ids: set[int],
+        key_share: bool = False
+    ) -> set[int]:
+        '''
+        Поиск существующих ID одним запросом
+
+        Args:
+            ids (set[int]): Проверяемые ID
+            key_share (bool, optional): Заблокировать найденные строки \
+                `FOR KEY SHARE` до конца транзакции, чтобы их нельзя было \
+                    удалить, пока на них создаются ссылки. \
+                        Defaults to False.
+
+        Returns:
+            set[int]: ID из `ids`, для которых есть сущности в БД
+        '''
+        if not ids:
+            return set()
+        id_column = getattr(self.model_class, 'id')
+        statement = select(id_column).where(id_column.in_(ids))
+        if key_share:
+            statement = statement.order_by(id_column).with_for_update(
+                read=True,
+                key_share=True
+            )
+        existing = await self.repository.scalars_all(statement)
+        return set(existing)
+
+    async def exists(self, filter: dict[str, Any]) -> bool:
+        '''
+        Проверка на существование сущности по фильтру запросом \
+            `SELECT EXISTS (...)` без загрузки сущности и ее связей
+
+        Args:
+            filter (dict[str, Any]): Фильтр поиска сущности в БД. \
+                `{"Название_атрибута": Значение_атрибута}`
+
         Raises:
             WrongFilterError: Ошибка, выбрасываемая в случае \
                 некорректности фильтра
@@ -134,15 +247,57 @@ class BaseService[M]:
         if not self._is_correct_filter(filter):
             raise self._wrong_filter_error
 
-        statement = self._add_model_attrs_to_statement(
-            select(self.model_class),
-            model_attrs
+        id_column = getattr(self.model_class, 'id')
+        return await self.repository.exists(
+            select(id_column).filter_by(**filter)
         )
-        model = await self.repository.scalars_one_or_none(
-            statement.filter_by(**filter)
-        )
-        await self.repository.db.flush()
-        return bool(model)
+
+    async def count(self, filter: dict[str, Any] = {}) -> int:
+        '''
+        Точное количество сущностей по фильтру (`SELECT count(*)`)
+
+        Args:
+            filter (dict[str, Any], optional): Фильтр поиска сущностей \
+                в БД. `{"Название_атрибута": Значение_атрибута}`. \
+                    Defaults to {} - все сущности.
+
+        Returns:
+            int: Количество сущностей
+        '''
+        statement = select(func.count()).select_from(
+            self.model_class
+        ).filter_by(**filter)
+        return await self.repository.scalar_one(statement)
+
+    async def get_fields(
+        self,
+        filter: dict[str, Any],
+        fields: list[str]
+    ) -> dict[str, Any]:
+        '''
+        Поиск в БД сущности по фильтру с выборкой только указанных колонок. \
+            SQLAlchemy-модель и ее связи не загружаются
+
+        Args:
+            filter (dict[str, Any]): Фильтр поиска сущности в БД. \
+                `{"Название_атрибута": Значение_атрибута}`
+            fields (list[str]): Названия колонок
+
+        Raises:
+            BadRequestError: Неизвестное название колонки
+            NotFoundError: Не удалось найти сущность по фильтру
+
+        Returns:
+            dict[str, Any]: Значения колонок по их названиям
+        '''
+        if not self._is_correct_filter(filter):
+            raise self._wrong_filter_error
+
+        statement = select(*self._get_columns(fields)).filter_by(**filter)
+        row = await self.repository.mappings_one_or_none(statement)
+        if row is None:
+            raise NotFoundError(self.model_name, filter)
+        return row
 
     async def get_all(
         self,
@@ -170,6 +325,178 @@ class BaseService[M]:
         await self.repository.db.flush()
         return list(models)
 
+    async def get_page(
+        self,
+        limit: int,
+        after: str | None = None,
+        with_total: bool = False,
+        model_attrs: list[_AttrType] = []
+    ) -> Page[M]:
+        '''
+        Постраничный поиск сущностей с keyset-пагинацией по ID
+
+        Args:
+            limit (int): Максимальное количество сущностей на странице
+            after (str | None, optional): Курсор, полученный вместе с \
+                предыдущей страницей. Defaults to None.
+            with_total (bool, optional): Добавить приблизительное \
+                количество сущностей из статистики Postgres. \
+                    Defaults to False.
+            model_attrs (list[_AttrType], optional): Дополнительно \
+                подгружаемые сложные аттрибуты SQLAlchemy модели. \
+                    Defaults to [].
+
+        Raises:
+            BadRequestError: Некорректный курсор
+
+        Returns:
+            Page[M]: Страница найденных сущностей
+        '''
+        statement = self._add_model_attrs_to_statement(
+            select(self.model_class),
+            model_attrs
+        )
+        models = list(await self.repository.scalars_all(
+            self._paginate(statement, limit, after)
+        ))
+        page = Page(items=models[:limit])
+        if len(models) > limit:
+            page.next_cursor = encode_cursor(getattr(page.items[-1], 'id'))
+        if with_total:
+            page.total = await self._approximate_count()
+        await self.repository.db.flush()
+        return page
+
+    async def get_fields_page(
+        self,
+        limit: int,
+        fields: list[str],
+        after: str | None = None,
+        with_total: bool = False
+    ) -> Page[dict[str, Any]]:
+        '''
+        Постраничный поиск сущностей с keyset-пагинацией по ID \
+            с выборкой только указанных колонок. SQLAlchemy-модели \
+                не загружаются
+
+        Args:
+            limit (int): Максимальное количество сущностей на странице
+            fields (list[str]): Названия колонок
+            after (str | None, optional): Курсор, полученный вместе с \
+                предыдущей страницей. Defaults to None.
+            with_total (bool, optional): Добавить приблизительное \
+                количество сущностей из статистики Postgres. \
+                    Defaults to False.
+
+        Raises:
+            BadRequestError: Некорректный курсор или название колонки
+
+        Returns:
+            Page[dict[str, Any]]: Страница значений колонок сущностей
+        '''
+        rows = await self.repository.mappings_all(self._paginate(
+            select(*self._get_columns(fields)),
+            limit,
+            after
+        ))
+        page = Page(items=rows[:limit])
+        if len(rows) > limit:
+            page.next_cursor = encode_cursor(page.items[-1]['id'])
+        if with_total:
+            page.total = await self._approximate_count()
+        return page
+
+    async def get_random(self, n: int = 1) -> list[M]:
+        '''
+        Поиск `n` различных случайных сущностей без чтения всей таблицы.
+
+        Случайные ID генерируются в самом запросе равномерно в диапазоне \
+            `[min(id), max(id)]` с запасом на дыры в последовательности ID, \
+                поэтому сущности выбираются одним запросом по индексу. \
+                    Если из-за дыр сущностей не хватило, выбор повторяется \
+                        до `_random_attempts` раз, а для очень разреженных \
+                            таблиц остаток выбирается `ORDER BY random()`.
+
+        Args:
+            n (int, optional): Количество сущностей. Defaults to 1.
+
+        Returns:
+            list[M]: Список случайных сущностей в случайном порядке. \
+                Может быть короче `n`, если в таблице меньше сущностей
+        '''
+        id_column = getattr(self.model_class, 'id')
+        bounds = select(
+            func.min(id_column).label('low'),
+            func.max(id_column).label('high')
+        ).cte('bounds')
+        candidate_ids = select(
+            bounds.c.low + func.floor(
+                func.random() * (bounds.c.high - bounds.c.low + 1)
+            ).cast(Integer)
+        ).select_from(
+            bounds,
+            func.generate_series(1, n * self._random_oversampling)
+        )
+
+        models: list[M] = []
+        for attempt in range(self._random_attempts + 1):
+            statement = select(self.model_class)
+            if attempt < self._random_attempts:
+                # Без ORDER BY Postgres отдал бы первые по плану
+                # совпадения - обычно с меньшими ID
+                statement = statement.where(
+                    id_column.in_(candidate_ids)
+                ).order_by(func.random())
+            else:
+                statement = statement.order_by(func.random())
+            if models:
+                statement = statement.where(
+                    id_column.not_in([getattr(m, 'id') for m in models])
+                )
+            models += await self.repository.scalars_all(
+                statement.limit(n - len(models))
+            )
+            if len(models) >= n:
+                break
+
+        random.shuffle(models)
+        return models
+
+    async def export_ndjson(
+        self,
+        schema_class: type[BaseSimpleSchema],
+        options: list[LoaderOption] = []
+    ) -> AsyncGenerator[bytes, None]:
+        '''
+        Выгрузка всех сущностей в NDJSON по одной сущности на строку. \
+            Сущности читаются серверным курсором по `_export_chunk_size` \
+                штук, поэтому расход памяти не зависит от размера таблицы.
+
+        Выгрузка открывает собственную сессию БД, так как потоковый \
+            ответ отправляется уже после закрытия сессии запроса
+
+        Args:
+            schema_class (type[BaseSimpleSchema]): Pydantic-схема строки
+            options (list[LoaderOption], optional): Параметры загрузки \
+                связей SQLAlchemy-модели. Defaults to [].
+
+        Yields:
+            Iterator[AsyncGenerator[bytes, None]]: Строки NDJSON \
+                пачками по `_export_chunk_size` сущностей
+        '''
+        id_column = getattr(self.model_class, 'id')
+        statement = select(self.model_class).options(*options).order_by(
+            id_column
+        ).execution_options(yield_per=self._export_chunk_size)
+        async with await open_read_session() as session:
+            result = await session.stream_scalars(statement)
+            async for models in result.partitions():
+                yield ''.join(
+                    schema_class.model_validate(model).model_dump_json()
+                    + '\n'
+                    for model in models
+                ).encode('utf8')
+
     async def update(self, model: M) -> M | None:
         '''
         Обновление сущности
@@ -199,6 +526,88 @@ class BaseService[M]:
         statement = delete(self.model_class).filter_by(**filter)
         await self.repository.delete(statement)
 
+    def _paginate(
+        self,
+        statement: Select,
+        limit: int,
+        after: str | None
+    ) -> Select:
+        '''
+        Добавляет к запросу keyset-пагинацию по ID. Выбирается на одну \
+            сущность больше `limit`, чтобы узнать, есть ли следующая \
+                страница
+
+        Args:
+            statement (Select): Запрос в БД
+            limit (int): Максимальное количество сущностей на странице
+            after (str | None): Курсор предыдущей страницы
+
+        Raises:
+            BadRequestError: Некорректный курсор
+
+        Returns:
+            Select: Запрос страницы
+        '''
+        id_column = getattr(self.model_class, 'id')
+        if after is not None:
+            statement = statement.where(
+                id_column > self._decode_id_cursor(after)
+            )
+        return statement.order_by(id_column).limit(limit + 1)
+
+    async def _approximate_count(self) -> int:
+        '''
+        Приблизительное количество сущностей из статистики Postgres
+
+        Returns:
+            int: Количество сущностей
+        '''
+        return await self.repository.approximate_count(
+            getattr(self.model_class, '__tablename__')
+        )
+
+    def _decode_id_cursor(self, after: str) -> int:
+        '''
+        Декодирует курсор keyset-пагинации по ID
+
+        Args:
+            after (str): Курсор, полученный вместе с предыдущей страницей
+
+        Raises:
+            BadRequestError: Некорректный курсор
+
+        Returns:
+            int: ID последней сущности предыдущей страницы
+        '''
+        after_id = decode_cursor(after)
+        if type(after_id) is not int or not 0 <= after_id <= MAX_ID:
+            raise BadRequestError(f'Некорректный курсор "{after}"')
+        return after_id
+
+    def _get_columns(self, fields: list[str]) -> list[Any]:
+        '''
+        Колонки SQLAlchemy-модели по их названиям. ID добавляется всегда, \
+            так как по нему строится курсор пагинации
+
+        Args:
+            fields (list[str]): Названия колонок
+
+        Raises:
+            BadRequestError: Неизвестное название колонки
+
+        Returns:
+            list[Any]: Колонки SQLAlchemy-модели
+        '''
+        columns = getattr(self.model_class, '__table__').columns
+        unknown = [field for field in fields if field not in columns]
+        if unknown:
+            raise BadRequestError(
+                f'Неизвестные поля {", ".join(unknown)}. '
+                f'Доступные поля: {", ".join(columns.keys())}'
+            )
+        names = dict.fromkeys(['id', *fields])
+        return [columns[name] for name in names]
+
     def _add_model_attrs_to_statement(
         self,
         statement: Select,
@@ -0,0 +1,274 @@
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+
+from config import PostgresSettings, settings
+from benchmarks.runner import (
+    BenchmarkConfig, ScenarioResult, find_regressions, make_report,
+    reset_tables, run_scenario, seed
+)
+from benchmarks.scenarios import SCENARIOS, get_uncovered_routes
+
+DEFAULT_BASELINE = Path(__file__).with_name('baseline.json')
+
+
+def use_database(database: str) -> None:
+    '''
+    Переключает настройки приложения на отдельную БД замеров без реплик. \
+        Вызывается до импорта приложения: движки БД создаются при импорте
+
+    Args:
+        database (str): Название БД замеров на сервере Postgres из настроек
+
+    Raises:
+        ValueError: Указана рабочая БД из настроек
+    '''
+    if database == settings.postgres.postgres_db:
+        raise ValueError(
+            f'Database "{database}" is the application database, '
+            'use a dedicated benchmark database'
+        )
+    settings.postgres = PostgresSettings.model_validate({
+        **settings.postgres.model_dump(),
+        'postgres_db': database,
+        'db_replica_dsns': []
+    })
+
+
+async def run_benchmarks(
+    app: FastAPI,
+    config: BenchmarkConfig,
+    names: list[str],
+    truncate: bool
+) -> dict[str, Any]:
+    '''
+    Запускает приложение в процессе, загружает данные в пустые таблицы \
+        и замеряет сценарии
+
+    Args:
+        app (FastAPI): Приложение, настроенное на БД замеров
+        config (BenchmarkConfig): Параметры замеров
+        names (list[str]): Подстроки названий сценариев. Пустой список - \
+            все сценарии
+        truncate (bool): Очистить непустые таблицы перед загрузкой
+
+    Raises:
+        RuntimeError: Таблицы не пусты, а очистка не разрешена
+
+    Returns:
+        dict[str, Any]: Параметры и результаты замеров
+    '''
+    from db.database import async_session
+    from dependencies.services import redis_service_instance
+
+    # Количество SQL-запросов берется из заголовка Server-Timing
+    settings.timing.server_timing = True
+    scenarios = [
+        scenario for scenario in SCENARIOS
+        if not names or any(name in scenario.name for name in names)
+    ]
+    results: dict[str, ScenarioResult] = {}
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(
+                app=app,
+                raise_app_exceptions=False
+            ),
+            base_url='http://benchmark',
+            timeout=None
+        ) as client
+    ):
+        async with (
+            async_session() as session,
+            redis_service_instance.client() as redis_client
+        ):
+            await reset_tables(session, redis_client, truncate)
+        dataset = await seed(client, config)
+        print(
+            f'Seeded {len(dataset.article_ids)} articles, '
+            f'{len(dataset.comment_ids)} comments'
+        )
+        print(
+            f'{"scenario":<42} {"rps":>8} {"p50 ms":>8} {"p95 ms":>8} '
+            f'{"p99 ms":>8} {"q/req":>6} {"errors":>6}'
+        )
+        for scenario in scenarios:
+            result = await run_scenario(client, scenario, dataset, config)
+            results[scenario.name] = result
+            print(
+                f'{scenario.name:<42} {result.throughput:>8} '
+                f'{result.p50_ms:>8} {result.p95_ms:>8} {result.p99_ms:>8} '
+                f'{result.queries_per_request:>6} {result.errors:>6}'
+            )
+    return make_report(config, results)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    defaults = BenchmarkConfig()
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Нагрузочные замеры маршрутов статей и коментариев. '
+        'Данные загружаются в отдельную БД из --database на сервере '
+        'Postgres из настроек приложения и в Redis из настроек'
+    )
+    parser.add_argument(
+        '--database',
+        required=True,
+        help='БД замеров. Рабочая БД из настроек не принимается'
+    )
+    parser.add_argument(
+        '--truncate',
+        action='store_true',
+        help='Очистить таблицы статей и коментариев БД замеров, '
+        'если они не пусты. Без флага замеры на непустых таблицах '
+        'не запускаются'
+    )
+    parser.add_argument(
+        '--articles',
+        type=int,
+        default=defaults.articles,
+        help='Количество загружаемых статей'
+    )
+    parser.add_argument(
+        '--comments-per-article',
+        type=int,
+        default=defaults.comments_per_article,
+        help='Количество коментариев на статью'
+    )
+    parser.add_argument(
+        '--text-size',
+        type=int,
+        default=defaults.text_size,
+        help='Примерная длина текста статьи в символах'
+    )
+    parser.add_argument(
+        '--requests',
+        type=int,
+        default=defaults.requests,
+        help='Количество замеряемых запросов на сценарий'
+    )
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=defaults.warmup,
+        help='Количество запросов на сценарий до замеров'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=defaults.concurrency,
+        help='Количество одновременных запросов'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=defaults.seed,
+        help='Начальное значение генератора случайных чисел'
+    )
+    parser.add_argument(
+        '--scenario',
+        dest='scenarios',
+        action='append',
+        default=[],
+        help='Замерять только сценарии, в названии которых есть '
+        'эта подстрока. Можно указать несколько раз'
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=Path('bench_results.json'),
+        help='Файл результатов'
+    )
+    parser.add_argument(
+        '--baseline',
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help='Файл эталонных результатов'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='Допустимое ухудшение p95 и пропускной способности, '
+        'например 0.2 - 20%%'
+    )
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Сохранить результаты как эталонные вместо сравнения'
+    )
+    return parser
+
+
+def main() -> None:
+    args = get_parser().parse_args()
+
+    try:
+        use_database(args.database)
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+    # Импорт после выбора БД замеров, так как движки БД создаются
+    # при импорте приложения
+    from main import app
+
+    uncovered = get_uncovered_routes(app)
+    if uncovered:
+        print('Routes without benchmark scenarios:', *uncovered, sep='\n  ')
+        sys.exit(2)
+
+    config = BenchmarkConfig(
+        articles=args.articles,
+        comments_per_article=args.comments_per_article,
+        text_size=args.text_size,
+        requests=args.requests,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        seed=args.seed
+    )
+    try:
+        report = asyncio.run(run_benchmarks(
+            app,
+            config,
+            args.scenarios,
+            args.truncate
+        ))
+    except RuntimeError as e:
+        print(e)
+        sys.exit(2)
+    args.output.write_text(json.dumps(report, indent=2), 'utf8')
+    print(f'Results saved to {args.output}')
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2), 'utf8')
+        print(f'Baseline saved to {args.baseline}')
+        return
+
+    baseline: dict[str, Any] = {'scenarios': {}}
+    if not args.baseline.exists():
+        print(f'Baseline {args.baseline} not found, comparison skipped')
+    else:
+        baseline = json.loads(args.baseline.read_text('utf8'))
+        if baseline['config'] != report['config']:
+            print(
+                'Baseline was recorded with different parameters: '
+                f'{baseline["config"]}'
+            )
+            sys.exit(2)
+
+    regressions = find_regressions(report, baseline, args.threshold)
+    if regressions:
+        print('Regressions:', *regressions, sep='\n  ')
+        sys.exit(1)
+    print('No regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+import asyncio
+import math
+import random
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncGenerator
+import httpx
+from redis.asyncio import Redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from article.services.trending import TrendingService
+from base.bulk import MAX_BULK_SIZE
+from benchmarks.scenarios import (
+    Dataset, PlannedRequest, Scenario, make_article, make_comment
+)
+
+_DB_QUERIES_RE = re.compile(r'(?:^|,)\s*db;[^,]*desc="(\d+) queries"')
+
+# Среднее количество SQL-запросов сценариев со случайными данными немного
+# колеблется, поэтому рост меньше этого значения регрессией не считается
+QUERIES_TOLERANCE = 0.1
+
+
+@dataclass
+class BenchmarkConfig:
+    '''
+    Параметры замеров. Сохраняются вместе с результатами: сравнивать \
+        можно только результаты с одинаковыми параметрами
+
+    Args:
+        articles (int): Количество загружаемых статей
+        comments_per_article (int): Количество коментариев на статью
+        text_size (int): Примерная длина текста статьи в символах
+        requests (int): Количество замеряемых запросов на сценарий
+        warmup (int): Количество запросов на сценарий до замеров
+        concurrency (int): Количество одновременных запросов
+        seed (int): Начальное значение генератора случайных чисел
+    '''
+    articles: int = 1000
+    comments_per_article: int = 5
+    text_size: int = 2000
+    requests: int = 200
+    warmup: int = 20
+    concurrency: int = 10
+    seed: int = 0
+
+
+@dataclass
+class ScenarioResult:
+    '''
+    Результат замеров сценария
+
+    Args:
+        requests (int): Количество замеренных запросов
+        errors (int): Количество ответов с кодом 4xx и 5xx
+        throughput (float): Запросов в секунду
+        p50_ms (float): Медиана времени ответа в миллисекундах
+        p95_ms (float): 95-й перцентиль времени ответа в миллисекундах
+        p99_ms (float): 99-й перцентиль времени ответа в миллисекундах
+        queries_per_request (float): Среднее количество SQL-запросов \
+            до начала ответа по заголовку `Server-Timing`
+    '''
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    queries_per_request: float
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    '''
+    Перцентиль методом ближайшего ранга
+
+    Args:
+        sorted_values (list[float]): Значения по возрастанию
+        percent (float): Перцентиль от 0 до 100
+
+    Returns:
+        float: Значение перцентиля или 0, если значений нет
+    '''
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def get_query_count(server_timing: str | None) -> int:
+    '''
+    Количество SQL-запросов из заголовка `Server-Timing`
+
+    Args:
+        server_timing (str | None): Значение заголовка
+
+    Returns:
+        int: Количество SQL-запросов или 0, если заголовка нет
+    '''
+    if server_timing is None:
+        return 0
+    match = _DB_QUERIES_RE.search(server_timing)
+    return int(match.group(1)) if match else 0
+
+
+async def reset_tables(
+    session: AsyncSession,
+    redis_client: Redis,
+    truncate: bool
+) -> None:
+    '''
+    Готовит БД замеров к загрузке данных. Время маршрутов списков \
+        и выгрузки зависит от размера таблиц, поэтому замеры сравнимы \
+            только при загрузке в пустые таблицы
+
+    Args:
+        session (AsyncSession): Сессия БД замеров
+        redis_client (Redis): Клиент Redis
+        truncate (bool): Очистить непустые таблицы статей и коментариев
+
+    Raises:
+        RuntimeError: Таблицы не пусты, а очистка не разрешена
+    '''
+    count = await session.scalar(text(
+        'SELECT (SELECT count(*) FROM article) '
+        '+ (SELECT count(*) FROM comment)'
+    ))
+    if count:
+        if not truncate:
+            raise RuntimeError(
+                f'Benchmark database has {count} articles and comments, '
+                'pass --truncate to clear them'
+            )
+        # Последовательности ID не сбрасываются, чтобы новые статьи
+        # не попадали в кэш статей прошлых замеров в Redis
+        await session.execute(text('TRUNCATE comment, article'))
+        await session.commit()
+    # Рейтинг прошлых замеров ссылается на удаленные статьи
+    await TrendingService(redis_client).rebuild(session)
+
+
+async def seed(
+    client: httpx.AsyncClient,
+    config: BenchmarkConfig
+) -> Dataset:
+    '''
+    Загружает статьи и коментарии через маршруты массового создания, \
+        чтобы счетчики, рейтинг и кэш заполнялись как в работе
+
+    Args:
+        client (httpx.AsyncClient): Клиент приложения
+        config (BenchmarkConfig): Параметры замеров
+
+    Raises:
+        RuntimeError: Приложение не создало часть данных
+
+    Returns:
+        Dataset: ID загруженных статей и коментариев
+    '''
+    rng = random.Random(f'{config.seed}:seed')
+    dataset = Dataset(text_size=config.text_size)
+
+    async def create_many(
+        path: str,
+        items: list[dict[str, Any]]
+    ) -> AsyncGenerator[list[int], None]:
+        for start in range(0, len(items), MAX_BULK_SIZE):
+            response = await client.post(
+                path,
+                json=items[start:start + MAX_BULK_SIZE]
+            )
+            response.raise_for_status()
+            result = response.json()
+            if result['errors']:
+                raise RuntimeError(
+                    f'{path} rejected items: {result["errors"][:3]}'
+                )
+            yield [created['id'] for created in result['created']]
+
+    articles = [
+        make_article(rng, dataset) for _ in range(config.articles)
+    ]
+    async for ids in create_many('/api/articles/bulk', articles):
+        dataset.article_ids.extend(ids)
+
+    comments = [
+        make_comment(rng, dataset, article_id)
+        for article_id in dataset.article_ids
+        for _ in range(config.comments_per_article)
+    ]
+    async for ids in create_many('/api/comments/bulk', comments):
+        dataset.comment_ids.extend(ids)
+
+    # Без cookie чтения из основной БД после записи замеры чтения
+    # попадут на реплики, как у обычных клиентов
+    client.cookies.clear()
+    return dataset
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    dataset: Dataset,
+    config: BenchmarkConfig
+) -> ScenarioResult:
+    '''
+    Выполняет запросы сценария с постоянным количеством одновременных \
+        запросов. Запросы строятся заранее генератором со своим \
+            начальным значением для каждого сценария, поэтому не зависят \
+                от порядка выполнения и других сценариев
+
+    Args:
+        client (httpx.AsyncClient): Клиент приложения
+        scenario (Scenario): Сценарий
+        dataset (Dataset): Загруженные данные
+        config (BenchmarkConfig): Параметры замеров
+
+    Returns:
+        ScenarioResult: Результат замеров
+    '''
+    rng = random.Random(f'{config.seed}:{scenario.name}')
+    planned = [
+        scenario.make_request(rng, dataset)
+        for _ in range(config.warmup + config.requests)
+    ]
+    latencies: list[float] = []
+    errors = 0
+    queries = 0
+
+    async def send(request: PlannedRequest) -> httpx.Response:
+        path, kwargs = request
+        return await client.request(scenario.method, path, **kwargs)
+
+    async def worker(requests: list[PlannedRequest]) -> None:
+        nonlocal errors, queries
+        for request in requests:
+            started_at = time.perf_counter()
+            response = await send(request)
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code >= 400:
+                errors += 1
+            queries += get_query_count(response.headers.get('server-timing'))
+
+    for request in planned[:config.warmup]:
+        await send(request)
+    client.cookies.clear()
+
+    measured = planned[config.warmup:]
+    started_at = time.perf_counter()
+    await asyncio.gather(*(
+        worker(measured[i::config.concurrency])
+        for i in range(config.concurrency)
+    ))
+    seconds = time.perf_counter() - started_at
+    client.cookies.clear()
+
+    latencies.sort()
+    return ScenarioResult(
+        requests=len(latencies),
+        errors=errors,
+        throughput=round(len(latencies) / seconds, 1) if seconds else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000, 2),
+        p95_ms=round(percentile(latencies, 95) * 1000, 2),
+        p99_ms=round(percentile(latencies, 99) * 1000, 2),
+        queries_per_request=round(queries / len(latencies), 2)
+        if latencies else 0.0
+    )
+
+
+def make_report(
+    config: BenchmarkConfig,
+    results: dict[str, ScenarioResult]
+) -> dict[str, Any]:
+    '''
+    Результаты замеров для сохранения в JSON
+
+    Args:
+        config (BenchmarkConfig): Параметры замеров
+        results (dict[str, ScenarioResult]): Результаты по сценариям
+
+    Returns:
+        dict[str, Any]: Параметры и результаты замеров
+    '''
+    return {
+        'config': asdict(config),
+        'scenarios': {
+            name: asdict(result) for name, result in results.items()
+        }
+    }
+
+
+def find_regressions(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float
+) -> list[str]:
+    '''
+    Сравнивает результаты с эталонными. Регрессия - ошибки в ответах, \
+        рост p95 или падение пропускной способности больше чем на \
+            `threshold`, рост количества SQL-запросов на запрос
+
+    Args:
+        report (dict[str, Any]): Результаты замеров
+        baseline (dict[str, Any]): Эталонные результаты
+        threshold (float): Допустимое отклонение, например 0.2 - 20%
+
+    Returns:
+        list[str]: Описания регрессий
+    '''
+    regressions: list[str] = []
+    for name, current in report['scenarios'].items():
+        if current['errors']:
+            regressions.append(
+                f'{name}: {current["errors"]} error responses'
+            )
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        if current['p95_ms'] > base['p95_ms'] * (1 + threshold):
+            regressions.append(
+                f'{name}: p95 {base["p95_ms"]} -> {current["p95_ms"]} ms'
+            )
+        if current['throughput'] < base['throughput'] * (1 - threshold):
+            regressions.append(
+                f'{name}: throughput {base["throughput"]} -> '
+                f'{current["throughput"]} rps'
+            )
+        if (
+            current['queries_per_request']
+            > base['queries_per_request'] + QUERIES_TOLERANCE
+        ):
+            regressions.append(
+                f'{name}: queries per request '
+                f'{base["queries_per_request"]} -> '
+                f'{current["queries_per_request"]}'
+            )
+    return regressions
@@ -0,0 +1,318 @@
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+# Префиксы маршрутов, каждый из которых должен быть покрыт сценарием
+BENCHMARKED_PREFIXES = ('/api/articles', '/api/comments')
+
+BULK_BENCHMARK_SIZE = 10
+IDS_BENCHMARK_SIZE = 20
+
+WORDS = (
+    'lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing',
+    'elit', 'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'ut', 'labore',
+    'et', 'dolore', 'magna', 'aliqua'
+)
+
+
+@dataclass
+class Dataset:
+    '''
+    Данные, загруженные перед замерами
+
+    Args:
+        article_ids (list[int]): ID статей
+        comment_ids (list[int]): ID коментариев
+        text_size (int): Примерная длина текста статьи в символах
+    '''
+    article_ids: list[int] = field(default_factory=list)
+    comment_ids: list[int] = field(default_factory=list)
+    text_size: int = 2000
+
+
+# Путь запроса и аргументы `httpx.AsyncClient.request`
+type PlannedRequest = tuple[str, dict[str, Any]]
+
+
+@dataclass
+class Scenario:
+    '''
+    Сценарий нагрузки на один маршрут
+
+    Args:
+        name (str): Название сценария в результатах
+        method (str): HTTP-метод
+        route (str): Шаблон пути маршрута, например \
+            `/api/articles/{article_id}`
+        make_request (Callable[[random.Random, Dataset], PlannedRequest]): \
+            Строит очередной запрос из загруженных данных
+    '''
+    name: str
+    method: str
+    route: str
+    make_request: Callable[[random.Random, Dataset], PlannedRequest]
+
+
+def make_text(rng: random.Random, size: int) -> str:
+    '''
+    Случайный текст из слов `WORDS`
+
+    Args:
+        rng (random.Random): Генератор случайных чисел
+        size (int): Примерная длина текста в символах
+
+    Returns:
+        str: Текст
+    '''
+    words: list[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+
+def make_article(rng: random.Random, dataset: Dataset) -> dict[str, Any]:
+    '''
+    Тело запроса создания статьи
+
+    Args:
+        rng (random.Random): Генератор случайных чисел
+        dataset (Dataset): Загруженные данные
+
+    Returns:
+        dict[str, Any]: Статья
+    '''
+    return {
+        'title': make_text(rng, 40),
+        'text': make_text(rng, dataset.text_size)
+    }
+
+
+def make_comment(
+    rng: random.Random,
+    dataset: Dataset,
+    article_id: int | None = None
+) -> dict[str, Any]:
+    '''
+    Тело запроса создания коментария
+
+    Args:
+        rng (random.Random): Генератор случайных чисел
+        dataset (Dataset): Загруженные данные
+        article_id (int | None, optional): ID статьи. Defaults to None - \
+            случайная статья из загруженных.
+
+    Returns:
+        dict[str, Any]: Коментарий
+    '''
+    return {
+        'text': make_text(rng, 200),
+        'score': rng.randint(0, 5),
+        'article_id': article_id or rng.choice(dataset.article_ids)
+    }
+
+
+def sample_ids(rng: random.Random, ids: list[int]) -> str:
+    '''
+    Случайные ID через запятую для параметра `ids`
+
+    Args:
+        rng (random.Random): Генератор случайных чисел
+        ids (list[int]): ID, из которых выбираются случайные
+
+    Returns:
+        str: ID через запятую
+    '''
+    sample = rng.sample(ids, min(IDS_BENCHMARK_SIZE, len(ids)))
+    return ','.join(str(id) for id in sample)
+
+
+# Сценарии чтения идут первыми, чтобы создание сущностей во время замеров
+# не меняло данные, которые читают остальные сценарии
+SCENARIOS = (
+    Scenario(
+        'GET /api/articles/{article_id}',
+        'GET',
+        '/api/articles/{article_id}',
+        lambda rng, data: (
+            f'/api/articles/{rng.choice(data.article_ids)}', {}
+        )
+    ),
+    Scenario(
+        'GET /api/articles/{article_id}?fields',
+        'GET',
+        '/api/articles/{article_id}',
+        lambda rng, data: (
+            f'/api/articles/{rng.choice(data.article_ids)}',
+            {'params': {'fields': 'id,title,comment_count'}}
+        )
+    ),
+    Scenario(
+        'GET /api/articles/cached/{article_id}',
+        'GET',
+        '/api/articles/cached/{article_id}',
+        lambda rng, data: (
+            f'/api/articles/cached/{rng.choice(data.article_ids)}', {}
+        )
+    ),
+    Scenario(
+        'GET /api/articles/cached/stats',
+        'GET',
+        '/api/articles/cached/stats',
+        lambda rng, data: ('/api/articles/cached/stats', {})
+    ),
+    Scenario(
+        'GET /api/articles/',
+        'GET',
+        '/api/articles/',
+        lambda rng, data: ('/api/articles/', {})
+    ),
+    Scenario(
+        'GET /api/articles/?ids',
+        'GET',
+        '/api/articles/',
+        lambda rng, data: (
+            '/api/articles/',
+            {'params': {'ids': sample_ids(rng, data.article_ids)}}
+        )
+    ),
+    Scenario(
+        'GET /api/articles/summary',
+        'GET',
+        '/api/articles/summary',
+        lambda rng, data: ('/api/articles/summary', {})
+    ),
+    Scenario(
+        'GET /api/articles/trending',
+        'GET',
+        '/api/articles/trending',
+        lambda rng, data: ('/api/articles/trending', {})
+    ),
+    Scenario(
+        'GET /api/articles/random',
+        'GET',
+        '/api/articles/random',
+        lambda rng, data: ('/api/articles/random', {'params': {'n': 10}})
+    ),
+    Scenario(
+        'GET /api/articles/{article_id}/comments',
+        'GET',
+        '/api/articles/{article_id}/comments',
+        lambda rng, data: (
+            f'/api/articles/{rng.choice(data.article_ids)}/comments', {}
+        )
+    ),
+    Scenario(
+        'GET /api/articles/{article_id}/stats',
+        'GET',
+        '/api/articles/{article_id}/stats',
+        lambda rng, data: (
+            f'/api/articles/{rng.choice(data.article_ids)}/stats', {}
+        )
+    ),
+    Scenario(
+        'GET /api/articles/export',
+        'GET',
+        '/api/articles/export',
+        lambda rng, data: ('/api/articles/export', {})
+    ),
+    Scenario(
+        'GET /api/comments/{comment_id}',
+        'GET',
+        '/api/comments/{comment_id}',
+        lambda rng, data: (
+            f'/api/comments/{rng.choice(data.comment_ids)}', {}
+        )
+    ),
+    Scenario(
+        'GET /api/comments/',
+        'GET',
+        '/api/comments/',
+        lambda rng, data: ('/api/comments/', {})
+    ),
+    Scenario(
+        'GET /api/comments/?ids',
+        'GET',
+        '/api/comments/',
+        lambda rng, data: (
+            '/api/comments/',
+            {'params': {'ids': sample_ids(rng, data.comment_ids)}}
+        )
+    ),
+    Scenario(
+        'GET /api/comments/trending',
+        'GET',
+        '/api/comments/trending',
+        lambda rng, data: ('/api/comments/trending', {'params': {'n': 10}})
+    ),
+    Scenario(
+        'GET /api/comments/export',
+        'GET',
+        '/api/comments/export',
+        lambda rng, data: ('/api/comments/export', {})
+    ),
+    Scenario(
+        'POST /api/articles/',
+        'POST',
+        '/api/articles/',
+        lambda rng, data: (
+            '/api/articles/', {'json': make_article(rng, data)}
+        )
+    ),
+    Scenario(
+        'POST /api/articles/bulk',
+        'POST',
+        '/api/articles/bulk',
+        lambda rng, data: (
+            '/api/articles/bulk',
+            {'json': [
+                make_article(rng, data) for _ in range(BULK_BENCHMARK_SIZE)
+            ]}
+        )
+    ),
+    Scenario(
+        'POST /api/comments/',
+        'POST',
+        '/api/comments/',
+        lambda rng, data: (
+            '/api/comments/', {'json': make_comment(rng, data)}
+        )
+    ),
+    Scenario(
+        'POST /api/comments/bulk',
+        'POST',
+        '/api/comments/bulk',
+        lambda rng, data: (
+            '/api/comments/bulk',
+            {'json': [
+                make_comment(rng, data) for _ in range(BULK_BENCHMARK_SIZE)
+            ]}
+        )
+    ),
+)
+
+
+def get_uncovered_routes(app: FastAPI) -> list[str]:
+    '''
+    Маршруты статей и коментариев, для которых нет сценария. Новый \
+        маршрут без сценария считается ошибкой набора замеров
+
+    Args:
+        app (FastAPI): Приложение
+
+    Returns:
+        list[str]: Маршруты в виде `METHOD /path`
+    '''
+    covered = {(scenario.method, scenario.route) for scenario in SCENARIOS}
+    return [
+        f'{method} {route.path}'
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        and route.path.startswith(BENCHMARKED_PREFIXES)
+        for method in sorted(route.methods)
+        if (method, route.path) not in covered
+    ]
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query
+from base.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from changes.schemas.schema import ChangesSchema
+from changes.services.service import ChangesService
+from dependencies.services import changes_service
+from metrics.timing import TimedRoute
+
+router = APIRouter(
+    prefix='/changes',
+    tags=['Изменения'],
+    route_class=TimedRoute
+)
+
+
+@router.get(
+    path='/',
+    summary='Лента изменений статей и коментариев',
+    description='Статьи и коментарии, созданные или измененные после '
+    'позиции токена `since`, не больше `limit` строк каждого типа. '
+    'Без `since` лента отдается с начала. Передайте `next_token` '
+    'в `since` следующего запроса; пока `has_more` равен `true`, '
+    'следующую страницу можно запросить сразу. Удаления в ленту '
+    'не попадают',
+    response_model=ChangesSchema
+)
+async def get_changes(
+    since: str | None = Query(
+        None,
+        description='Токен `next_token` из предыдущего ответа'
+    ),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    service: ChangesService = Depends(changes_service)
+):
+    return await service.get_changes(since, limit)
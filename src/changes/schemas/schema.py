@@ -0,0 +1,22 @@
+from base.schema import BaseSimpleSchema
+from article.schemas.schema import ArticleChangeSchema
+from comment.schemas.schema import CommentChangeSchema
+
+
+class ChangesSchema(BaseSimpleSchema):
+    '''
+    Pydantic-схема страницы ленты изменений
+
+    Args:
+        articles (list[ArticleChangeSchema]): Статьи, созданные или \
+            измененные после позиции токена, в порядке версий
+        comments (list[CommentChangeSchema]): Коментарии, созданные или \
+            измененные после позиции токена, в порядке версий
+        next_token (str): Токен для следующего запроса
+        has_more (bool): `True` - изменения получены не полностью, \
+            следующую страницу можно запросить сразу
+    '''
+    articles: list[ArticleChangeSchema]
+    comments: list[CommentChangeSchema]
+    next_token: str
+    has_more: bool
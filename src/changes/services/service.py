@@ -0,0 +1,182 @@
+from dataclasses import dataclass, field
+from typing import Any
+from sqlalchemy import BigInteger, Text, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import lazyload
+from article.models.model import ArticleModel
+from base.pagination import decode_cursor, encode_cursor
+from base.repository import BaseRepository
+from comment.models.model import CommentModel
+from exceptions.exception import BadRequestError
+
+# Версия и ID хранятся в BIGINT, большие значения из токена Postgres
+# не примет
+MAX_POSITION = 2 ** 63 - 1
+
+TABLES = ('article', 'comment')
+
+
+@dataclass
+class ChangesPage:
+    '''
+    Страница ленты изменений
+
+    Args:
+        articles (list[ArticleModel]): Созданные или измененные статьи
+        comments (list[CommentModel]): Созданные или измененные коментарии
+        next_token (str): Токен для следующего запроса
+        has_more (bool): `True` - изменения получены не полностью
+    '''
+    articles: list[ArticleModel] = field(default_factory=list)
+    comments: list[CommentModel] = field(default_factory=list)
+    next_token: str = ''
+    has_more: bool = False
+
+
+class ChangesService:
+    '''
+    Лента изменений статей и коментариев для синхронизации копий \
+        во внешних сервисах.
+
+    Версия строки - ID транзакции, которая ее записала. Токен хранит \
+        позицию `(version, id)` последней отданной строки каждой таблицы. \
+            Отдаются только строки транзакций, завершившихся до начала \
+                самой старой из выполняющихся транзакций (xmin снимка), \
+                    поэтому строка транзакции, зафиксированной позже \
+                        транзакций с большими ID, не будет пропущена.
+
+    Удаления в ленту не попадают
+    '''
+
+    def __init__(self, db: AsyncSession) -> None:
+        '''
+        Лента изменений статей и коментариев
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+        '''
+        self.db = db
+        self.repository = BaseRepository[ArticleModel](db)
+
+    async def get_changes(
+        self,
+        since: str | None,
+        limit: int
+    ) -> ChangesPage:
+        '''
+        Строки, созданные или измененные после позиций токена, \
+            не больше `limit` строк каждой таблицы
+
+        Args:
+            since (str | None): Токен из предыдущего ответа. \
+                `None` - лента с начала
+            limit (int): Максимальное количество строк каждой таблицы
+
+        Raises:
+            BadRequestError: Некорректный токен
+
+        Returns:
+            ChangesPage: Страница ленты изменений
+        '''
+        positions = self.__decode_token(since)
+        watermark = await self.repository.scalar_one(select(
+            func.pg_snapshot_xmin(func.pg_current_snapshot())
+            .cast(Text).cast(BigInteger)
+        ))
+
+        articles = await self.__get_rows(
+            ArticleModel,
+            lazyload(ArticleModel.comments),
+            positions['article'],
+            watermark,
+            limit
+        )
+        comments = await self.__get_rows(
+            CommentModel,
+            lazyload(CommentModel.article),
+            positions['comment'],
+            watermark,
+            limit
+        )
+        page = ChangesPage(
+            articles=articles[:limit],
+            comments=comments[:limit],
+            has_more=len(articles) > limit or len(comments) > limit
+        )
+        if page.articles:
+            last_article = page.articles[-1]
+            positions['article'] = [last_article.version, last_article.id]
+        if page.comments:
+            last_comment = page.comments[-1]
+            positions['comment'] = [last_comment.version, last_comment.id]
+        page.next_token = encode_cursor(positions)
+        return page
+
+    async def __get_rows[M: (ArticleModel, CommentModel)](
+        self,
+        model: type[M],
+        option: Any,
+        position: list[int],
+        watermark: int,
+        limit: int
+    ) -> list[M]:
+        '''
+        Строки таблицы после позиции `(version, id)` версий меньше \
+            `watermark`, не больше `limit + 1` строк
+
+        Args:
+            model (type[M]): Класс SQLAlchemy-модели таблицы
+            option (Any): Опция загрузки связей модели
+            position (list[int]): Позиция `(version, id)` последней \
+                отданной строки
+            watermark (int): Граница версий (xmin снимка)
+            limit (int): Максимальное количество строк
+
+        Returns:
+            list[M]: Строки по возрастанию `(version, id)`
+        '''
+        statement = (
+            select(model)
+            .options(option)
+            .where(
+                tuple_(model.version, model.id) > tuple_(*(
+                    literal(value, BigInteger) for value in position
+                )),
+                model.version < watermark
+            )
+            .order_by(model.version, model.id)
+            .limit(limit + 1)
+        )
+        return list(await BaseRepository[M](self.db).scalars_all(statement))
+
+    def __decode_token(self, token: str | None) -> dict[str, list[int]]:
+        '''
+        Позиции `(version, id)` таблиц из токена
+
+        Args:
+            token (str | None): Токен. `None` - начальные позиции
+
+        Raises:
+            BadRequestError: Некорректный токен
+
+        Returns:
+            dict[str, list[int]]: Позиции по названиям таблиц
+        '''
+        if token is None:
+            return {name: [0, 0] for name in TABLES}
+        positions = decode_cursor(token)
+        if not (
+            isinstance(positions, dict)
+            and positions.keys() == set(TABLES)
+            and all(
+                isinstance(position, list)
+                and len(position) == 2
+                and all(
+                    type(value) is int and 0 <= value <= MAX_POSITION
+                    for value in position
+                )
+                for position in positions.values()
+            )
+        ):
+            raise BadRequestError(f'Некорректный токен "{token}"')
+        return positions
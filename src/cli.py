@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from db.database import async_session
+from storage.redis import RedisService
+from article.services.service import ArticleService
+from article.services.trending import TrendingService
+from article.schemas.schema import ArticleExportSchema
+from comment.schemas.schema import CommentSchema
+from importer.importer import Checkpoint, CopyImporter, ImportStats
+
+
+async def rebuild_trending() -> None:
+    '''
+    Пересчитывает рейтинг популярных статей по данным из БД
+    '''
+    redis_service = RedisService()
+    try:
+        async with (
+            async_session() as session,
+            redis_service.client() as client
+        ):
+            count = await TrendingService(client).rebuild(session)
+    finally:
+        await redis_service.disconnect()
+    print(f'Trending rebuilt: {count} articles')
+
+
+async def reconcile_stats(batch_size: int) -> None:
+    '''
+    Пересчитывает счетчики коментариев статей по таблице коментариев
+
+    Args:
+        batch_size (int): Количество ID статей в одной транзакции
+    '''
+    redis_service = RedisService()
+    try:
+        async with (
+            async_session() as session,
+            redis_service.client() as client
+        ):
+            service = ArticleService(session, client, TrendingService(client))
+            count = await service.reconcile_comment_stats(batch_size)
+    finally:
+        await redis_service.disconnect()
+    print(f'Comment stats reconciled: {count} articles fixed')
+
+
+async def import_data(
+    articles: Path | None,
+    comments: Path | None,
+    batch_size: int,
+    drop_indexes: bool,
+    checkpoint_path: Path | None,
+    prime_cache: bool
+) -> None:
+    '''
+    Загружает статьи и коментарии из NDJSON/CSV через `COPY`, затем \
+        пересчитывает счетчики и рейтинг статей и заполняет кэш
+
+    Args:
+        articles (Path | None): Файл статей
+        comments (Path | None): Файл коментариев
+        batch_size (int): Количество записей в одной транзакции
+        drop_indexes (bool): Удалить индексы на время загрузки
+        checkpoint_path (Path | None): Файл состояния загрузки
+        prime_cache (bool): Заполнить кэш загруженными статьями
+    '''
+    checkpoint = Checkpoint(checkpoint_path)
+    redis_service = RedisService()
+    try:
+        async with (
+            async_session() as session,
+            redis_service.client() as client
+        ):
+            importer = CopyImporter(
+                session,
+                checkpoint,
+                batch_size,
+                drop_indexes
+            )
+            results: list[ImportStats] = []
+            if articles is not None:
+                results.append(await importer.import_file(
+                    'article', articles, ArticleExportSchema
+                ))
+            if comments is not None:
+                results.append(await importer.import_file(
+                    'comment', comments, CommentSchema
+                ))
+            for stats in results:
+                print(
+                    f'{stats.table}: {stats.imported} imported, '
+                    f'{stats.skipped} skipped'
+                )
+
+            trending_service = TrendingService(client)
+            service = ArticleService(session, client, trending_service)
+            if comments is not None:
+                fixed = await service.reconcile_comment_stats(batch_size)
+                print(f'Comment stats reconciled: {fixed} articles fixed')
+                count = await trending_service.rebuild(session)
+                print(f'Trending rebuilt: {count} articles')
+            if prime_cache:
+                ids = sorted({
+                    id
+                    for stats in results
+                    for id in await importer.get_article_ids(stats)
+                })
+                await service.prime_cache(ids)
+                print(f'Cache primed: {len(ids)} articles')
+    finally:
+        await redis_service.disconnect()
+    checkpoint.clear()
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Служебные команды')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser(
+        'rebuild-trending',
+        help='Пересчитать рейтинг популярных статей из Postgres'
+    )
+
+    reconcile_parser = subparsers.add_parser(
+        'reconcile-stats',
+        help='Исправить расхождения счетчиков коментариев статей'
+    )
+    reconcile_parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=10000,
+        help='Количество ID статей в одной транзакции'
+    )
+
+    import_parser = subparsers.add_parser(
+        'import',
+        help='Загрузить статьи и коментарии из NDJSON/CSV через COPY'
+    )
+    import_parser.add_argument(
+        '--articles',
+        type=Path,
+        help='Файл статей (.ndjson, .jsonl или .csv) с полями id, title, text'
+    )
+    import_parser.add_argument(
+        '--comments',
+        type=Path,
+        help='Файл коментариев (.ndjson, .jsonl или .csv) с полями '
+        'id, text, score, article_id'
+    )
+    import_parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=10000,
+        help='Количество записей в одной транзакции'
+    )
+    import_parser.add_argument(
+        '--drop-indexes',
+        action='store_true',
+        help='Удалить индексы на время загрузки и построить их в конце'
+    )
+    import_parser.add_argument(
+        '--checkpoint',
+        type=Path,
+        help='Файл состояния для продолжения прерванной загрузки'
+    )
+    import_parser.add_argument(
+        '--no-prime-cache',
+        dest='prime_cache',
+        action='store_false',
+        help='Не заполнять кэш загруженными статьями'
+    )
+
+    return parser
+
+
+def main() -> None:
+    args = get_parser().parse_args()
+
+    if args.command == 'rebuild-trending':
+        asyncio.run(rebuild_trending())
+    elif args.command == 'reconcile-stats':
+        asyncio.run(reconcile_stats(args.batch_size))
+    elif args.command == 'import':
+        if args.articles is None and args.comments is None:
+            get_parser().error('Укажите --articles и/или --comments')
+        asyncio.run(import_data(
+            args.articles,
+            args.comments,
+            args.batch_size,
+            args.drop_indexes,
+            args.checkpoint,
+            args.prime_cache
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,9 @@
-from base.model import BaseModel
+from base.model import ROW_VERSION_DEFAULT, BaseModel
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey
+from sqlalchemy import (
+    BigInteger, DateTime, FetchedValue, ForeignKey, Index, func, text
+)
+from datetime import datetime
 from comment.schemas.schema import CommentSchema, CommentSimpleSchema
 from typing import TYPE_CHECKING
 
@@ -10,8 +13,32 @@ if TYPE_CHECKING:
 
 class CommentModel(BaseModel):
     __tablename__ = 'comment'
+    __table_args__ = (
+        Index('ix_comment_article_id_id', 'article_id', 'id'),
+        Index(
+            'ix_comment_article_id_score_id',
+            'article_id',
+            text('score DESC'),
+            text('id DESC')
+        ),
+        Index('ix_comment_version_id', 'version', 'id'),
+    )
     score: Mapped[int] = mapped_column()
     text: Mapped[str] = mapped_column()
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        server_onupdate=FetchedValue()
+    )
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        server_default=ROW_VERSION_DEFAULT,
+        server_onupdate=FetchedValue()
+    )
 
     article_id: Mapped[int] = mapped_column(ForeignKey('article.id'))
     article: Mapped['ArticleModel'] = relationship(
@@ -1,10 +1,27 @@
-from fastapi import APIRouter, Depends
-from comment.schemas.schema import CommentSchema, CommentSimpleSchema
+from typing import Any
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from comment.schemas.schema import (
+    CommentPartialSchema, CommentSchema, CommentSimpleSchema
+)
+from base.schema import PageSchema
+from base.pagination import (
+    DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, Page, parse_fields, parse_ids
+)
 from comment.services.service import CommentService
-from dependencies.services import comment_service
+from dependencies.services import comment_read_service, comment_service
 from comment.models.model import CommentModel
+from base.bulk import MAX_BULK_SIZE, BulkResult, validate_many
+from base.http import (
+    is_not_modified, make_etag, not_modified_response, set_cache_headers
+)
+from metrics.timing import TimedRoute
 
-router = APIRouter(prefix='/comments', tags=['Коментарии'])
+router = APIRouter(
+    prefix='/comments',
+    tags=['Коментарии'],
+    route_class=TimedRoute
+)
 
 
 @router.post(
@@ -20,38 +37,135 @@ async def create_comment(
     return await service.create(CommentModel.from_schema(schema))
 
 
+@router.post(
+    path='/bulk',
+    summary='Массовое создание коментариев',
+    description='Массовое создание коментариев. Каждый элемент проверяется '
+    'отдельно: ошибки одних элементов не отменяют создание остальных',
+    response_model=BulkResult
+)
+async def create_comments_bulk(
+    items: list[Any] = Body(max_length=MAX_BULK_SIZE),
+    service: CommentService = Depends(comment_service)
+):
+    schemas, errors = validate_many(CommentSimpleSchema, items)
+    result = await service.create_many({
+        index: CommentModel.from_schema(schema)
+        for index, schema in schemas.items()
+    })
+    result.errors = sorted(
+        result.errors + errors,
+        key=lambda error: error.index
+    )
+    return result
+
+
+@router.get(
+    path='/export',
+    summary='Выгрузка всех коментариев в NDJSON',
+    description='Потоковая выгрузка всех коментариев в формате NDJSON: '
+    'по одному JSON-объекту на строку в порядке ID',
+    response_class=StreamingResponse
+)
+async def export_comments(
+    service: CommentService = Depends(comment_service)
+):
+    return StreamingResponse(
+        service.export(),
+        media_type='application/x-ndjson'
+    )
+
+
 @router.get(
     path='/trending',
     summary='Получение случайного коментария',
-    description='Получение случайного коментария',
-    response_model=CommentSchema
+    description='Получение случайного коментария. '
+    'Если передан параметр `n`, возвращается список из `n` различных '
+    'случайных коментариев',
+    response_model=CommentSchema | list[CommentSchema]
 )
 async def get_comment_tranding(
-    service: CommentService = Depends(comment_service)
+    n: int | None = Query(None, ge=1, le=MAX_PAGE_LIMIT),
+    service: CommentService = Depends(comment_read_service)
 ):
-    return await service.get_trending()
+    if n is None:
+        return await service.get_trending()
+    return await service.get_random(n)
 
 
 @router.get(
     path='/{comment_id}',
     summary='Получение коментария по его ID',
-    description='Получение коментария по его ID',
-    response_model=CommentSchema
+    description='Получение коментария по его ID. Если передан параметр '
+    '`fields`, возвращаются только перечисленные поля. Если ETag из '
+    '`If-None-Match` совпадает с текущим, возвращается '
+    '`304 Not Modified` без чтения коментария',
+    response_model=CommentSchema | CommentPartialSchema,
+    response_model_exclude_unset=True
 )
 async def get_comment(
     comment_id: int,
-    service: CommentService = Depends(comment_service)
+    request: Request,
+    response: Response,
+    fields: str | None = Query(
+        None,
+        description='Поля через запятую, например `id,score`'
+    ),
+    service: CommentService = Depends(comment_read_service)
 ):
+    field_names = parse_fields(fields) if fields is not None else None
+    validator = await service.get_validator(comment_id, field_names)
+    if validator is not None:
+        etag = make_etag(validator)
+        if is_not_modified(request.headers.get('if-none-match'), etag):
+            return not_modified_response(etag)
+        set_cache_headers(response, etag)
+    if field_names is not None:
+        return await service.get_fields({"id": comment_id}, field_names)
     return await service.get({"id": comment_id})
 
 
 @router.get(
     path='/',
-    summary='Получение всех коментариев',
-    description='Получение всех коментариев',
-    response_model=list[CommentSchema]
+    summary='Получение коментариев постранично',
+    description='Получение коментариев постранично (keyset-пагинация по ID). '
+    'Для получения следующей страницы передайте `next_cursor` '
+    'в параметр `after`. Если передан параметр `ids`, возвращаются '
+    'коментарии с этими ID в порядке запроса. Если передан параметр '
+    '`fields`, возвращаются только перечисленные поля',
+    response_model=PageSchema[CommentSchema | CommentPartialSchema],
+    response_model_exclude_unset=True
 )
 async def get_all_comments(
-    service: CommentService = Depends(comment_service)
+    ids: str | None = Query(
+        None,
+        description='ID через запятую, например `1,2,3`'
+    ),
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    after: str | None = Query(None, description='Курсор следующей страницы'),
+    with_total: bool = Query(
+        False,
+        description='Добавить приблизительное количество коментариев'
+    ),
+    fields: str | None = Query(
+        None,
+        description='Поля через запятую, например `id,score`'
+    ),
+    service: CommentService = Depends(comment_read_service)
 ):
-    return await service.get_all()
+    field_names = parse_fields(fields) if fields is not None else None
+    if ids is not None and field_names is not None:
+        return Page(items=await service.get_fields_by_ids(
+            parse_ids(ids),
+            field_names
+        ))
+    if ids is not None:
+        return Page(items=await service.get_by_ids(parse_ids(ids)))
+    if field_names is not None:
+        return await service.get_fields_page(
+            limit,
+            field_names,
+            after,
+            with_total
+        )
+    return await service.get_page(limit, after, with_total)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import Field
 from base.schema import BaseSchema, BaseSimpleSchema
 
@@ -27,3 +28,43 @@ class CommentSchema(CommentSimpleSchema, BaseSchema):
         article_id (int): ID статьи, для которой написан этот коментарий
     '''
     pass
+
+
+class CommentPartialSchema(BaseSimpleSchema):
+    '''
+    Pydantic-схема коментария с выбранными через `fields` полями. \
+        Невыбранные поля не попадают в ответ
+
+    Args:
+        id (int | None): ID
+        text (str | None): Содержимое коментария
+        score (int | None): Оценка коментария от 0 до 5 включительно
+        article_id (int | None): ID статьи, для которой написан \
+            этот коментарий
+        created_at (datetime | None): Дата и время создания коментария
+        updated_at (datetime | None): Дата и время последнего изменения
+        version (int | None): Версия коментария
+    '''
+    id: int | None = None
+    text: str | None = None
+    score: int | None = None
+    article_id: int | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    version: int | None = None
+
+
+class CommentChangeSchema(CommentSchema):
+    '''
+    Pydantic-схема измененного коментария для ленты изменений
+
+    Args:
+        id (int): ID
+        text (str): Содержимое коментария
+        score (int): Оценка коментария от 0 до 5 включительно
+        article_id (int): ID статьи, для которой написан этот коментарий
+        updated_at (datetime): Дата и время последнего изменения
+        version (int): Версия коментария
+    '''
+    updated_at: datetime
+    version: int
@@ -2,10 +2,20 @@ from base.service import BaseService
 from comment.models.model import CommentModel
 from comment.repositories.repository import CommentRepository
 from sqlalchemy.ext.asyncio import AsyncSession
-from exceptions.exception import AlreadyExistsError
+from article.models.model import SCORE_HISTOGRAM_SIZE
 from article.services.service import ArticleService
-from exceptions.exception import NotFoundError
-import random
+from article.services.trending import TrendingService
+from exceptions.exception import BadRequestError, NotFoundError
+from typing import Any, AsyncGenerator, Literal
+from sqlalchemy import Integer, delete, literal, select, tuple_
+from sqlalchemy.orm import lazyload
+from base.bulk import BulkError, BulkResult
+from base.pagination import MAX_ID, Page, decode_cursor, encode_cursor
+from comment.schemas.schema import CommentSchema
+from db.database import after_commit
+from storage.cache import digest
+
+CommentSort = Literal['id', 'score']
 
 
 class CommentService(BaseService[CommentModel]):
@@ -16,7 +26,8 @@ class CommentService(BaseService[CommentModel]):
     def __init__(
         self,
         db: AsyncSession,
-        article_service: ArticleService
+        article_service: ArticleService,
+        trending_service: TrendingService
     ) -> None:
         '''
         Бизнес-логика для коментариев
@@ -24,6 +35,7 @@ class CommentService(BaseService[CommentModel]):
         Args:
             db (AsyncSession): Асинхронная сессия БД
             article_service (ArticleService): Бизнес-логика статей
+            trending_service (TrendingService): Рейтинг популярных статей
         '''
         super().__init__(
             CommentRepository(db),
@@ -31,6 +43,7 @@ class CommentService(BaseService[CommentModel]):
             model_name='comment'
         )
         self.__article_service = article_service
+        self.__trending_service = trending_service
 
     async def create(self, model: CommentModel) -> CommentModel:
         '''
@@ -40,27 +53,145 @@ class CommentService(BaseService[CommentModel]):
             model (CommentModel): SQLAlchemy-модель комментария
 
         Raises:
-            NotNotFoundError: Статья не существует
+            NotFoundError: Статья не существует
             AlreadyExistsError: Комментарий с таким ID уже существует
 
         Returns:
             CommentModel: SQLAlchemy-модель созданного комментария
         '''
-        comment_filter = {"id": model.id}
+        model = await super().create(model)
+        await self.__article_service.update_comment_stats(
+            added=[(model.article_id, model.score)]
+        )
+        article_id, score, created_at = (
+            model.article_id, model.score, model.created_at
+        )
+        after_commit(
+            self.repository.db,
+            lambda: self.__trending_service.register_comment(
+                article_id,
+                score,
+                created_at
+            )
+        )
+        self.__article_service.invalidate_cache(model.article_id)
+        return model
+
+    async def create_many(
+        self,
+        models: dict[int, CommentModel]
+    ) -> BulkResult:
+        '''
+        Массовое создание комментариев. Существование статей проверяется \
+            одним запросом, комментарии к несуществующим статьям \
+                не создаются и попадают в ошибки. Найденные статьи \
+                    блокируются от удаления до конца транзакции
 
-        article_filter = {"id": model.article_id}
-        article_exists = await self.__article_service.exists(article_filter)
+        Args:
+            models (dict[int, CommentModel]): SQLAlchemy-модели \
+                комментариев по их индексам в запросе
 
-        if not article_exists:
-            raise NotFoundError(
+        Returns:
+            BulkResult: Созданные комментарии и ошибки по индексам в запросе
+        '''
+        article_ids = {model.article_id for model in models.values()}
+        existing_ids = await self.__article_service.get_existing_ids(
+            article_ids,
+            key_share=True
+        )
+        errors = [
+            BulkError(index, NotFoundError(
                 self.__article_service.model_name,
-                article_filter
+                {'id': model.article_id}
+            ).detail)
+            for index, model in models.items()
+            if model.article_id not in existing_ids
+        ]
+        models = {
+            index: model
+            for index, model in models.items()
+            if model.article_id in existing_ids
+        }
+
+        result = await super().create_many(models)
+        result.errors += errors
+        await self.__article_service.update_comment_stats(added=[
+            (model.article_id, model.score) for model in models.values()
+        ])
+        registered = [
+            (model.article_id, model.score) for model in models.values()
+        ]
+        after_commit(
+            self.repository.db,
+            lambda: self.__trending_service.register_comments(registered)
+        )
+        for article_id in {model.article_id for model in models.values()}:
+            self.__article_service.invalidate_cache(article_id)
+        return result
+
+    async def update(self, model: CommentModel) -> CommentModel | None:
+        '''
+        Обновление комментария с пересчетом счетчиков и сбросом \
+            кэша его статьи. Строка комментария блокируется до чтения \
+                текущих статьи и оценки, поэтому одновременные изменения \
+                    одного комментария не вычитают одну оценку дважды
+
+        Args:
+            model (CommentModel): SQLAlchemy-модель комментария
+
+        Raises:
+            NotFoundError: Комментарий не найден
+
+        Returns:
+            CommentModel | None: SQLAlchemy-модель обновленного комментария
+        '''
+        current = await self.repository.mappings_one_or_none(
+            select(CommentModel.article_id, CommentModel.score)
+            .where(CommentModel.id == model.id)
+            .with_for_update()
+        )
+        if current is None:
+            raise NotFoundError(self.model_name, {'id': model.id})
+        removed = [(current['article_id'], current['score'])]
+        article_ids = {current['article_id'], model.article_id}
+        updated = await super().update(model)
+        if updated is not None:
+            await self.__article_service.update_comment_stats(
+                added=[(updated.article_id, updated.score)],
+                removed=removed
             )
+        for article_id in article_ids:
+            self.__article_service.invalidate_cache(article_id)
+        return updated
 
-        exists = await self.exists(comment_filter)
-        if exists:
-            raise AlreadyExistsError(self.model_name, comment_filter)
-        return await super().create(model)
+    async def delete(self, filter: dict[str, Any]) -> None:
+        '''
+        Удаление комментариев по фильтру с пересчетом счетчиков \
+            и сбросом кэша их статей. Счетчики уменьшаются на оценки, \
+                которые вернул сам `DELETE ... RETURNING`, поэтому \
+                    одновременное удаление не учитывается дважды
+
+        Args:
+            filter (dict[str, Any]): Фильтр поиска сущности в БД. \
+                `{"Название_атрибута": Значение_атрибута}`
+
+        Raises:
+            NotFoundError: Не удалось найти сущность по фильтру
+        '''
+        if not self._is_correct_filter(filter):
+            raise self._wrong_filter_error
+        result = await self.repository.db.execute(
+            delete(CommentModel).filter_by(**filter).returning(
+                CommentModel.article_id,
+                CommentModel.score
+            )
+        )
+        removed = [(row.article_id, row.score) for row in result]
+        if not removed:
+            raise NotFoundError(self.model_name, filter)
+        await self.__article_service.update_comment_stats(removed=removed)
+        for article_id in {article_id for article_id, _ in removed}:
+            self.__article_service.invalidate_cache(article_id)
 
     async def get_trending(self) -> CommentModel:
         '''
@@ -72,7 +203,139 @@ class CommentService(BaseService[CommentModel]):
         Returns:
             CommentModel: SQLAlchemy-модель комментария
         '''
-        models = await self.get_all()
+        models = await self.get_random()
         if not models:
             raise NotFoundError(self.model_name)
-        return random.choice(models)
+        return models[0]
+
+    async def get_validator(
+        self,
+        id: int,
+        fields: list[str] | None = None
+    ) -> str | None:
+        '''
+        Хэш версии коментария для ETag. Читается только колонка `version` \
+            по первичному ключу, сам коментарий не загружается. Версия \
+                меняется при любом изменении коментария
+
+        Args:
+            id (int): ID коментария
+            fields (list[str] | None, optional): Поля ответа. \
+                Defaults to None - все поля.
+
+        Returns:
+            str | None: Хэш версии или `None`, если коментария нет
+        '''
+        version = await self.repository.scalars_one_or_none(
+            select(CommentModel.version).where(CommentModel.id == id)
+        )
+        if version is None:
+            return None
+        return digest(f'{id}:{version}:{",".join(fields or ["*"])}')
+
+    def export(self) -> AsyncGenerator[bytes, None]:
+        '''
+        Потоковая выгрузка всех коментариев в NDJSON
+
+        Returns:
+            AsyncGenerator[bytes, None]: Строки NDJSON
+        '''
+        return self.export_ndjson(
+            CommentSchema,
+            [lazyload(CommentModel.article)]
+        )
+
+    async def get_article_page(
+        self,
+        article_id: int,
+        limit: int,
+        after: str | None = None,
+        sort: CommentSort = 'id'
+    ) -> Page[CommentModel]:
+        '''
+        Постраничный поиск коментариев статьи с keyset-пагинацией \
+            по индексам `(article_id, id)` \
+                и `(article_id, score DESC, id DESC)`
+
+        Args:
+            article_id (int): ID статьи
+            limit (int): Максимальное количество коментариев на странице
+            after (str | None, optional): Курсор, полученный вместе с \
+                предыдущей страницей. Defaults to None.
+            sort (CommentSort, optional): `id` - по возрастанию ID, \
+                `score` - по убыванию оценки. Defaults to 'id'.
+
+        Raises:
+            BadRequestError: Некорректный курсор
+            NotFoundError: Статья не существует
+
+        Returns:
+            Page[CommentModel]: Страница коментариев статьи
+        '''
+        statement = select(CommentModel).options(
+            lazyload(CommentModel.article)
+        ).where(CommentModel.article_id == article_id)
+
+        if sort == 'score':
+            if after is not None:
+                statement = statement.where(
+                    tuple_(CommentModel.score, CommentModel.id)
+                    < tuple_(*(
+                        literal(value, Integer)
+                        for value in self.__decode_score_cursor(after)
+                    ))
+                )
+            statement = statement.order_by(
+                CommentModel.score.desc(),
+                CommentModel.id.desc()
+            )
+        else:
+            if after is not None:
+                statement = statement.where(
+                    CommentModel.id > self._decode_id_cursor(after)
+                )
+            statement = statement.order_by(CommentModel.id)
+
+        models = list(await self.repository.scalars_all(
+            statement.limit(limit + 1)
+        ))
+        if not models and not await self.__article_service.exists(
+            {'id': article_id}
+        ):
+            raise NotFoundError(
+                self.__article_service.model_name,
+                {'id': article_id}
+            )
+
+        page = Page(items=models[:limit])
+        if len(models) > limit:
+            last = page.items[-1]
+            page.next_cursor = encode_cursor(
+                [last.score, last.id] if sort == 'score' else last.id
+            )
+        return page
+
+    def __decode_score_cursor(self, after: str) -> tuple[int, int]:
+        '''
+        Декодирует курсор пагинации по оценке
+
+        Args:
+            after (str): Курсор, полученный вместе с предыдущей страницей
+
+        Raises:
+            BadRequestError: Некорректный курсор
+
+        Returns:
+            tuple[int, int]: Оценка и ID последнего коментария \
+                предыдущей страницы
+        '''
+        position = decode_cursor(after)
+        if (
+            not isinstance(position, list)
+            or len(position) != 2
+            or not all(type(value) is int for value in position)
+            or not 0 <= position[0] < SCORE_HISTOGRAM_SIZE
+            or not 1 <= position[1] <= MAX_ID
+        ):
+            raise BadRequestError(f'Некорректный курсор "{after}"')
+        return position[0], position[1]
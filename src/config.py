@@ -10,6 +10,18 @@ class PostgresSettings(BaseSettings):
     postgres_user: str
     postgres_pass: str
 
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle_seconds: int = -1
+    db_pool_pre_ping: bool = False
+    db_statement_cache_size: int = 100
+    db_pgbouncer: bool = False
+
+    db_replica_dsns: list[str] = []
+    db_replica_retry_seconds: float = 5
+    db_read_primary_seconds: int = 5
+
     db_dsn: str = ''
     db_dsn_sync: str = ''
 
@@ -33,12 +45,60 @@ class RedisSettings(BaseSettings):
     redis_databases: int
     redis_password: str
 
+    redis_max_connections: int = 100
+    redis_pool_timeout: float = 5
+    redis_socket_timeout: float = 5
+    redis_socket_connect_timeout: float = 5
+    redis_health_check_interval: int = 30
+
+
+class CacheSettings(BaseSettings):
+    cache_local_max_size: int = 10000
+    cache_local_ttl_seconds: float = 5
+    cache_soft_ttl_seconds: int = 60 * 60
+    cache_hard_ttl_seconds: int = 6 * 60 * 60
+    cache_stale_while_revalidate: bool = False
+    cache_lock_ttl_seconds: float = 5
+
+
+class TrendingSettings(BaseSettings):
+    trending_decay_seconds: int = 45000
+    trending_score_weight: float = 1.0
+
+
+class HttpCacheSettings(BaseSettings):
+    http_cache_max_age: int = 0
+    http_cache_s_maxage: int = 0
+    http_cache_stale_while_revalidate: int = 0
+
+
+class CompressionSettings(BaseSettings):
+    compression_min_size: int = 1000
+    compression_level: int = 6
+
+
+class TimingSettings(BaseSettings):
+    server_timing: bool = True
+    n_plus_one_threshold: int = 10
+
 
 class Settings(BaseSettings):
+    debug: bool = False
+
     postgres: PostgresSettings
 
     redis: RedisSettings
 
+    cache: CacheSettings = CacheSettings()
+
+    trending: TrendingSettings = TrendingSettings()
+
+    http_cache: HttpCacheSettings = HttpCacheSettings()
+
+    compression: CompressionSettings = CompressionSettings()
+
+    timing: TimingSettings = TimingSettings()
+
     model_config = SettingsConfigDict(
         env_nested_delimiter='__',
         env_file='.env',
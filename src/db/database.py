@@ -1,23 +1,147 @@
-from typing import AsyncGenerator
-from config import settings
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Awaitable, Callable
+from config import PostgresSettings, settings
+from sqlalchemy import make_url
 from sqlalchemy.ext.asyncio import (
-    create_async_engine, async_sessionmaker, AsyncSession
+    AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 )
+from db.pool import InstrumentedQueuePool
+from metrics.metrics import instrument_engine
 
 
-async_engine = create_async_engine(settings.postgres.db_dsn, echo=False)
+def create_engine(
+    postgres: PostgresSettings,
+    dsn: str | None = None,
+    pool_pre_ping: bool | None = None,
+    name: str = 'primary'
+) -> AsyncEngine:
+    '''
+    Создает асинхронный движок с пулом соединений по настройкам
+
+    Args:
+        postgres (PostgresSettings): Настройки Postgres
+        dsn (str | None, optional): DSN сервера. \
+            Defaults to None - основной сервер.
+        pool_pre_ping (bool | None, optional): Проверять соединение \
+            перед выдачей из пула. Defaults to None - из настроек.
+        name (str, optional): Название БД в метриках. \
+            Defaults to 'primary'.
+
+    Returns:
+        AsyncEngine: Асинхронный движок SQLAlchemy
+    '''
+    url = make_url(postgres.db_dsn if dsn is None else dsn)
+    if pool_pre_ping is None:
+        pool_pre_ping = postgres.db_pool_pre_ping
+    statement_cache_size = postgres.db_statement_cache_size
+    connect_args: dict[str, Any] = {}
+    if postgres.db_pgbouncer:
+        # PgBouncer в режиме transaction выдает разные серверные соединения
+        # одному клиентскому, поэтому подготовленные запросы не кэшируются,
+        # а их имена не должны повторяться
+        statement_cache_size = 0
+        connect_args = {
+            'statement_cache_size': 0,
+            'prepared_statement_name_func': (
+                lambda: f'__asyncpg_{uuid.uuid4()}__'
+            )
+        }
+    # Диалект asyncpg SQLAlchemy подготавливает запросы сам и кэширует их
+    # в собственном LRU, размер которого задается параметром DSN
+    url = url.update_query_dict(
+        {'prepared_statement_cache_size': str(statement_cache_size)}
+    )
+    engine = create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=postgres.db_pool_size,
+        max_overflow=postgres.db_max_overflow,
+        pool_timeout=postgres.db_pool_timeout,
+        pool_recycle=postgres.db_pool_recycle_seconds,
+        pool_pre_ping=pool_pre_ping,
+        connect_args=connect_args
+    )
+    instrument_engine(engine, name)
+    return engine
+
+
+async_engine = create_engine(settings.postgres)
 async_session = async_sessionmaker(
     bind=async_engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+logger = logging.getLogger(__name__)
+
+AfterCommitCallback = Callable[[], Awaitable[None]]
+
+
+def after_commit(session: AsyncSession, callback: AfterCommitCallback) -> None:
+    '''
+    Откладывает вызов `callback` до успешной фиксации транзакции сессии \
+        в `get_db`. При откате транзакции вызов отменяется
+
+    Args:
+        session (AsyncSession): Асинхронная сессия БД
+        callback (AfterCommitCallback): Асинхронная функция без аргументов
+    '''
+    session.info.setdefault('after_commit', []).append(callback)
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    '''
+    Выполняет отложенные через `after_commit` вызовы. Ошибки логируются \
+        и не прерывают запрос, так как транзакция уже зафиксирована
+
+    Args:
+        session (AsyncSession): Асинхронная сессия БД
+    '''
+    for callback in session.info.pop('after_commit', []):
+        try:
+            await callback()
+        except Exception:
+            logger.exception('After-commit callback failed')
+
+
+@asynccontextmanager
+async def session_scope(
+    session: AsyncSession
+) -> AsyncGenerator[AsyncSession, None]:
+    '''
+    Транзакция сессии на время запроса: коммит при успешном выходе, \
+        откат при исключении и закрытие сессии. После коммита выполняет \
+            вызовы, отложенные через `after_commit`
+
+    Args:
+        session (AsyncSession): Асинхронная сессия БД
+
+    Yields:
+        AsyncSession: Та же сессия
+    '''
+    async with session:
+        try:
+            yield session
+            await session.commit()
+        except Exception as e:
+            session.info.pop('after_commit', None)
+            await session.rollback()
+            raise e
+        else:
+            await run_after_commit(session)
+        finally:
+            await session.close()
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     '''
     Генератор асинхронной сессии для зависимостей FastAPI.
     Предоставляет асинхронную сессию SQLAlchemy для работы с базой данных,
     автоматически обрабатывая коммит, откат транзакций и закрытие сессии.
+    После коммита выполняет вызовы, отложенные через `after_commit`.
 
     Yields:
         AsyncSession: Асинхронная сессия SQLAlchemy для работы с БД
@@ -26,12 +150,5 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         Exception: Любое исключение, возникшее при работе с сессией,
                   приводит к откату транзакции
     '''
-    async with async_session() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception as e:
-            await session.rollback()
-            raise e
-        finally:
-            await session.close()
+    async with session_scope(async_session()) as session:
+        yield session
@@ -0,0 +1,100 @@
+import time
+from dataclasses import dataclass
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+
+@dataclass
+class PoolStats:
+    '''
+    Состояние и счетчики пула соединений с БД
+
+    Args:
+        size (int): Постоянный размер пула
+        checked_in (int): Свободные соединения в пуле
+        checked_out (int): Выданные соединения
+        overflow (int): Соединения сверх постоянного размера пула \
+            (отрицательное значение - пул еще не заполнен)
+        max_overflow (int): Максимальное количество соединений сверх \
+            постоянного размера пула
+        checkouts (int): Количество выдач соединений
+        timeouts (int): Количество выдач, не дождавшихся соединения \
+            за `pool_timeout`
+        wait_seconds_total (float): Суммарное время ожидания соединения
+        wait_seconds_max (float): Максимальное время ожидания соединения
+    '''
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    '''
+    Пул соединений, который считает выдачи соединений и время \
+        их ожидания. Время ожидания включает ожидание свободного \
+            соединения, открытие нового соединения и pre-ping
+    '''
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_overflow = kwargs.get('max_overflow', 10)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        started_at = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait_seconds = time.perf_counter() - started_at
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def stats(self) -> PoolStats:
+        '''
+        Состояние и счетчики пула
+
+        Returns:
+            PoolStats: Состояние и счетчики пула
+        '''
+        return PoolStats(
+            size=self.size(),
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=self.overflow(),
+            max_overflow=self.max_overflow,
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            wait_seconds_total=self.wait_seconds_total,
+            wait_seconds_max=self.wait_seconds_max
+        )
+
+
+def get_pool_stats(engine: AsyncEngine) -> PoolStats | None:
+    '''
+    Состояние и счетчики пула соединений движка
+
+    Args:
+        engine (AsyncEngine): Асинхронный движок SQLAlchemy
+
+    Returns:
+        PoolStats | None: Состояние и счетчики пула или `None`, если \
+            движок работает без пула (`NullPool`)
+    '''
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return None
@@ -0,0 +1,180 @@
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import AsyncGenerator
+from fastapi import Request
+from sqlalchemy import make_url
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import PostgresSettings, settings
+from db.database import async_session, create_engine, session_scope
+
+logger = logging.getLogger(__name__)
+
+# Cookie клиента, который недавно что-то изменил. Пока она жива, его
+# чтения идут в основную БД, чтобы он видел свои изменения
+READ_PRIMARY_COOKIE = 'read_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class Replica:
+    '''
+    Реплика БД только для чтения
+
+    Args:
+        name (str): Название реплики для логов (хост и порт)
+        session (async_sessionmaker[AsyncSession]): Фабрика сессий реплики
+        down_until (float): Время `time.monotonic()`, до которого \
+            реплика считается недоступной
+    '''
+    name: str
+    session: async_sessionmaker[AsyncSession]
+    down_until: float = 0
+
+
+class ReplicaRouter:
+    '''
+    Выбор реплики для чтения по кругу. Соединение проверяется при выдаче \
+        из пула (pre-ping), недоступная реплика пропускается \
+            `db_replica_retry_seconds` секунд. Если доступных реплик нет, \
+                чтение идет в основную БД
+    '''
+
+    def __init__(self, postgres: PostgresSettings) -> None:
+        '''
+        Выбор реплики для чтения по кругу
+
+        Args:
+            postgres (PostgresSettings): Настройки Postgres
+        '''
+        self.retry_seconds = postgres.db_replica_retry_seconds
+        self.replicas: list[Replica] = []
+        for dsn in postgres.db_replica_dsns:
+            url = make_url(dsn)
+            name = f'{url.host}:{url.port}'
+            engine = create_engine(
+                postgres,
+                dsn=dsn,
+                pool_pre_ping=True,
+                name=name
+            )
+            self.replicas.append(Replica(
+                name=name,
+                session=async_sessionmaker(
+                    bind=engine,
+                    class_=AsyncSession,
+                    expire_on_commit=False
+                )
+            ))
+        self.__counter = itertools.count()
+
+    async def connect(self) -> AsyncSession | None:
+        '''
+        Сессия следующей доступной реплики с уже полученным соединением
+
+        Returns:
+            AsyncSession | None: Сессия реплики или `None`, если \
+                доступных реплик нет
+        '''
+        start = next(self.__counter)
+        for i in range(len(self.replicas)):
+            replica = self.replicas[(start + i) % len(self.replicas)]
+            if replica.down_until > time.monotonic():
+                continue
+            session = replica.session()
+            try:
+                await session.connection()
+            except (DBAPIError, PoolTimeoutError, OSError):
+                await session.close()
+                replica.down_until = time.monotonic() + self.retry_seconds
+                logger.warning(
+                    'Replica %s is unavailable, skipping it for %s seconds',
+                    replica.name,
+                    self.retry_seconds,
+                    exc_info=True
+                )
+                continue
+            return session
+        return None
+
+
+replica_router = ReplicaRouter(settings.postgres)
+
+
+async def open_read_session(read_primary: bool = False) -> AsyncSession:
+    '''
+    Сессия для чтения: на доступной реплике или в основной БД
+
+    Args:
+        read_primary (bool, optional): Читать из основной БД. \
+            Defaults to False.
+
+    Returns:
+        AsyncSession: Асинхронная сессия БД
+    '''
+    if not read_primary:
+        session = await replica_router.connect()
+        if session is not None:
+            return session
+    return async_session()
+
+
+async def get_read_db(
+    request: Request
+) -> AsyncGenerator[AsyncSession, None]:
+    '''
+    Генератор асинхронной сессии только для чтения для зависимостей \
+        FastAPI. Сессия открывается на реплике, а для клиентов, недавно \
+            изменявших данные, - в основной БД
+
+    Args:
+        request (Request): Запрос
+
+    Yields:
+        AsyncSession: Асинхронная сессия SQLAlchemy для чтения
+    '''
+    session = await open_read_session(
+        read_primary=READ_PRIMARY_COOKIE in request.cookies
+    )
+    async with session_scope(session) as session:
+        yield session
+
+
+class ReadPrimaryMiddleware:
+    '''
+    Ставит cookie `READ_PRIMARY_COOKIE` на `db_read_primary_seconds` \
+        секунд после успешного изменяющего запроса, чтобы следующие \
+            чтения клиента шли в основную БД, пока реплики его догоняют
+    '''
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope['type'] != 'http'
+            or scope['method'] in SAFE_METHODS
+            or not replica_router.replicas
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if (
+                message['type'] == 'http.response.start'
+                and 200 <= message['status'] < 400
+            ):
+                max_age = settings.postgres.db_read_primary_seconds
+                MutableHeaders(scope=message).append(
+                    'Set-Cookie',
+                    f'{READ_PRIMARY_COOKIE}=1; Max-Age={max_age}; '
+                    'Path=/; HttpOnly; SameSite=Lax'
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
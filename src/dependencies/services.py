@@ -2,12 +2,15 @@ from typing import AsyncGenerator
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.database import get_db
+from db.replicas import get_read_db
 from article.services.service import ArticleService
 from comment.services.service import CommentService
+from article.services.trending import TrendingService
+from changes.services.service import ChangesService
 from storage.redis import RedisService
 import redis.asyncio as redis
 
-__redis_service_instance = RedisService()
+redis_service_instance = RedisService()
 
 
 async def redis_service() -> AsyncGenerator[redis.Redis, None]:
@@ -17,13 +20,30 @@ async def redis_service() -> AsyncGenerator[redis.Redis, None]:
     Yields:
         Iterator[AsyncGenerator[redis.Redis, None]]: Клиент Redis-сервиса
     '''
-    async with __redis_service_instance.client() as client:
+    async with redis_service_instance.client() as client:
         yield client
 
 
+def trending_service(
+    service: redis.Redis = Depends(redis_service)
+) -> TrendingService:
+    '''
+    Сервис рейтинга популярных статей
+
+    Args:
+        service (redis.Redis, optional): Redis-сервис. \
+            Defaults to Depends(redis_service).
+
+    Returns:
+        TrendingService: Сервис рейтинга популярных статей
+    '''
+    return TrendingService(service)
+
+
 def article_service(
     db: AsyncSession = Depends(get_db),
-    service: redis.Redis = Depends(redis_service)
+    service: redis.Redis = Depends(redis_service),
+    trending_service: TrendingService = Depends(trending_service)
 ) -> ArticleService:
     '''
     Сервис статей
@@ -33,16 +53,19 @@ def article_service(
             Defaults to Depends(get_db).
         service (redis.Redis, optional): Redis-сервис. \
             Defaults to Depends(redis_service).
+        trending_service (TrendingService, optional): Сервис рейтинга \
+            популярных статей. Defaults to Depends(trending_service).
 
     Returns:
         ArticleService: _description_
     '''
-    return ArticleService(db, service)
+    return ArticleService(db, service, trending_service)
 
 
 def comment_service(
     db: AsyncSession = Depends(get_db),
-    article_service: ArticleService = Depends(article_service)
+    article_service: ArticleService = Depends(article_service),
+    trending_service: TrendingService = Depends(trending_service)
 ) -> CommentService:
     '''
     Сервис комментариев
@@ -52,8 +75,70 @@ def comment_service(
             Defaults to Depends(get_db).
         article_service (ArticleService, optional): Сервис статей. \
             Defaults to Depends(article_service).
+        trending_service (TrendingService, optional): Сервис рейтинга \
+            популярных статей. Defaults to Depends(trending_service).
 
     Returns:
         CommentService: _description_
     '''
-    return CommentService(db, article_service)
+    return CommentService(db, article_service, trending_service)
+
+
+def article_read_service(
+    db: AsyncSession = Depends(get_read_db),
+    service: redis.Redis = Depends(redis_service),
+    trending_service: TrendingService = Depends(trending_service)
+) -> ArticleService:
+    '''
+    Сервис статей только для чтения, работающий с репликой БД
+
+    Args:
+        db (AsyncSession, optional): Асинхронная сессия БД для чтения. \
+            Defaults to Depends(get_read_db).
+        service (redis.Redis, optional): Redis-сервис. \
+            Defaults to Depends(redis_service).
+        trending_service (TrendingService, optional): Сервис рейтинга \
+            популярных статей. Defaults to Depends(trending_service).
+
+    Returns:
+        ArticleService: Сервис статей
+    '''
+    return ArticleService(db, service, trending_service)
+
+
+def comment_read_service(
+    db: AsyncSession = Depends(get_read_db),
+    article_service: ArticleService = Depends(article_read_service),
+    trending_service: TrendingService = Depends(trending_service)
+) -> CommentService:
+    '''
+    Сервис комментариев только для чтения, работающий с репликой БД
+
+    Args:
+        db (AsyncSession, optional): Асинхронная сессия БД для чтения. \
+            Defaults to Depends(get_read_db).
+        article_service (ArticleService, optional): Сервис статей \
+            только для чтения. Defaults to Depends(article_read_service).
+        trending_service (TrendingService, optional): Сервис рейтинга \
+            популярных статей. Defaults to Depends(trending_service).
+
+    Returns:
+        CommentService: Сервис комментариев
+    '''
+    return CommentService(db, article_service, trending_service)
+
+
+def changes_service(
+    db: AsyncSession = Depends(get_read_db)
+) -> ChangesService:
+    '''
+    Сервис ленты изменений
+
+    Args:
+        db (AsyncSession, optional): Асинхронная сессия БД для чтения. \
+            Defaults to Depends(get_read_db).
+
+    Returns:
+        ChangesService: Сервис ленты изменений
+    '''
+    return ChangesService(db)
@@ -50,3 +50,19 @@ class RedisError(HTTPException):
         detail: Any
     ) -> None:
         super().__init__(self.status_code, detail)
+
+
+class BadRequestError(HTTPException):
+    status_code = 400
+
+    def __init__(
+        self,
+        detail: Any
+    ) -> None:
+        '''
+        Ошибка, возникающая при некорректных параметрах запроса
+
+        Args:
+            detail (Any): Описание ошибки
+        '''
+        super().__init__(self.status_code, detail)
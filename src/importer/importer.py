@@ -0,0 +1,408 @@
+import csv
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from base.schema import BaseSimpleSchema
+
+# Класс SQLSTATE нарушений ограничений: уникальность, внешний ключ и др.
+INTEGRITY_CONSTRAINT_VIOLATION = '23'
+
+
+def is_integrity_error(error: Exception) -> bool:
+    '''
+    Проверяет, что ошибка драйвера БД - нарушение ограничения таблицы
+
+    Args:
+        error (Exception): Ошибка драйвера БД
+
+    Returns:
+        bool: `True` - нарушение ограничения
+    '''
+    sqlstate = getattr(error, 'sqlstate', None)
+    return isinstance(sqlstate, str) and sqlstate.startswith(
+        INTEGRITY_CONSTRAINT_VIOLATION
+    )
+
+
+@dataclass
+class ImportStats:
+    '''
+    Результат загрузки файла в таблицу
+
+    Args:
+        table (str): Название таблицы
+        imported (int): Количество загруженных строк
+        skipped (int): Количество строк, не прошедших валидацию
+        id_range (list[int] | None): Минимальный и максимальный ID строк, \
+            загруженных из файла, в том числе до продолжения загрузки. \
+                `None` - строки не загружались
+    '''
+    table: str
+    imported: int = 0
+    skipped: int = 0
+    id_range: list[int] | None = None
+
+
+class Checkpoint:
+    '''
+    Состояние загрузки в JSON-файле: количество обработанных записей \
+        каждого файла и определения удаленных индексов. Позволяет \
+            продолжить прерванную загрузку с последней \
+                зафиксированной пачки
+    '''
+
+    def __init__(self, path: Path | None) -> None:
+        '''
+        Состояние загрузки в JSON-файле
+
+        Args:
+            path (Path | None): Путь к файлу состояния. `None` - состояние \
+                не сохраняется
+        '''
+        self.path = path
+        self.state: dict[str, dict[str, Any]] = {}
+        if path is not None and path.exists():
+            self.state = json.loads(path.read_text('utf8'))
+
+    def get(self, table: str) -> dict[str, Any]:
+        '''
+        Состояние загрузки таблицы
+
+        Args:
+            table (str): Название таблицы
+
+        Returns:
+            dict[str, Any]: `position` - количество обработанных записей \
+                файла, `indexes` - определения удаленных индексов, \
+                    `id_range` - минимальный и максимальный ID \
+                        загруженных строк
+        '''
+        return self.state.setdefault(
+            table,
+            {'position': 0, 'indexes': [], 'id_range': None}
+        )
+
+    def save(self) -> None:
+        '''
+        Атомарная запись состояния в файл
+        '''
+        if self.path is None:
+            return
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp_path.write_text(json.dumps(self.state), 'utf8')
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        '''
+        Удаление файла состояния после успешной загрузки
+        '''
+        if self.path is not None and self.path.exists():
+            self.path.unlink()
+
+
+def read_records(path: Path) -> Iterator[dict[str, Any]]:
+    '''
+    Построчное чтение записей из NDJSON или CSV (с заголовком). \
+        Формат определяется по расширению файла
+
+    Args:
+        path (Path): Путь к файлу `.ndjson`, `.jsonl` или `.csv`
+
+    Raises:
+        ValueError: Неизвестное расширение файла
+
+    Yields:
+        Iterator[dict[str, Any]]: Записи файла
+    '''
+    suffix = path.suffix.lower()
+    with path.open(encoding='utf8', newline='') as file:
+        if suffix == '.csv':
+            yield from csv.DictReader(file)
+        elif suffix in ('.ndjson', '.jsonl'):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(
+                f'Неизвестный формат файла "{path}". '
+                'Поддерживаются .ndjson, .jsonl и .csv'
+            )
+
+
+class CopyImporter:
+    '''
+    Загрузка записей из файлов в таблицы Postgres через `COPY`.
+
+    Записи валидируются Pydantic-схемой и загружаются пачками, каждая \
+        пачка - отдельной транзакцией. После фиксации пачки ее позиция \
+            сохраняется в файл состояния. Индексы таблицы (кроме \
+                индексов ограничений) можно удалить на время загрузки \
+                    и построить заново в конце
+    '''
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        checkpoint: Checkpoint,
+        batch_size: int = 10000,
+        drop_indexes: bool = False
+    ) -> None:
+        '''
+        Загрузка записей из файлов в таблицы Postgres через `COPY`
+
+        Args:
+            db (AsyncSession): Асинхронная сессия БД
+            checkpoint (Checkpoint): Состояние загрузки
+            batch_size (int, optional): Количество записей в одной \
+                транзакции. Defaults to 10000.
+            drop_indexes (bool, optional): Удалить индексы таблицы \
+                на время загрузки. Defaults to False.
+        '''
+        self.db = db
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        self.drop_indexes = drop_indexes
+
+    async def import_file(
+        self,
+        table: str,
+        path: Path,
+        schema_class: type[BaseSimpleSchema]
+    ) -> ImportStats:
+        '''
+        Загрузка файла в таблицу. Колонки таблицы совпадают с полями \
+            Pydantic-схемы, записи с ошибками валидации пропускаются
+
+        Args:
+            table (str): Название таблицы
+            path (Path): Путь к файлу
+            schema_class (type[BaseSimpleSchema]): Pydantic-схема записи
+
+        Returns:
+            ImportStats: Результат загрузки
+        '''
+        state = self.checkpoint.get(table)
+        columns = list(schema_class.model_fields)
+        stats = ImportStats(table, id_range=state.get('id_range'))
+
+        if self.drop_indexes:
+            await self.__drop_indexes(table, state)
+
+        batch: list[tuple[int, tuple[Any, ...]]] = []
+        position = 0
+        for position, record in enumerate(read_records(path), start=1):
+            if position <= state['position']:
+                continue
+            try:
+                schema = schema_class.model_validate(record)
+            except ValidationError as e:
+                stats.skipped += 1
+                print(f'{path}:{position}: {e.errors(include_url=False)}')
+                continue
+            values = schema.model_dump()
+            batch.append((
+                position,
+                tuple(values[column] for column in columns)
+            ))
+            if len(batch) >= self.batch_size:
+                await self.__import_batch(path, table, columns, batch, stats)
+                await self.__commit(table, state, position, stats)
+                batch = []
+
+        if batch or position > state['position']:
+            await self.__import_batch(path, table, columns, batch, stats)
+            await self.__commit(table, state, position, stats)
+
+        if self.drop_indexes:
+            await self.__create_indexes(state)
+        await self.__reset_sequence(table)
+        return stats
+
+    async def get_article_ids(self, stats: ImportStats) -> list[int]:
+        '''
+        ID статей, которых касаются загруженные из файла строки. Строки \
+            читаются из таблицы по диапазону ID, поэтому учитываются \
+                и строки, загруженные до продолжения загрузки
+
+        Args:
+            stats (ImportStats): Результат загрузки файла статей \
+                или коментариев
+
+        Returns:
+            list[int]: ID статей по возрастанию
+        '''
+        if stats.id_range is None:
+            return []
+        column = 'id' if stats.table == 'article' else 'article_id'
+        result = await self.db.execute(text(
+            f'SELECT DISTINCT {column} FROM "{stats.table}" '
+            f'WHERE id BETWEEN :first_id AND :last_id ORDER BY {column}'
+        ), {'first_id': stats.id_range[0], 'last_id': stats.id_range[1]})
+        return list(result.scalars())
+
+    async def __import_batch(
+        self,
+        path: Path,
+        table: str,
+        columns: list[str],
+        batch: list[tuple[int, tuple[Any, ...]]],
+        stats: ImportStats
+    ) -> None:
+        '''
+        Загрузка пачки записей через `COPY`. Если пачка нарушает \
+            ограничения таблицы (повтор ID, несуществующая статья), \
+                записи загружаются по одной, а нарушающие ограничения \
+                    пропускаются, чтобы продолжение загрузки не падало \
+                        на той же пачке
+
+        Args:
+            path (Path): Путь к файлу для сообщений о пропущенных записях
+            table (str): Название таблицы
+            columns (list[str]): Колонки таблицы
+            batch (list[tuple[int, tuple[Any, ...]]]): Номера записей \
+                в файле и значения их колонок
+            stats (ImportStats): Результат загрузки файла
+        '''
+        if not batch:
+            return
+        try:
+            await self.__copy(table, columns, [values for _, values in batch])
+            imported = batch
+        except Exception as e:
+            if not is_integrity_error(e):
+                raise
+            imported = []
+            for position, values in batch:
+                try:
+                    await self.__copy(table, columns, [values])
+                except Exception as row_error:
+                    if not is_integrity_error(row_error):
+                        raise
+                    stats.skipped += 1
+                    print(f'{path}:{position}: {row_error}')
+                    continue
+                imported.append((position, values))
+
+        id_index = columns.index('id')
+        ids = [values[id_index] for _, values in imported]
+        if stats.id_range is not None:
+            ids += stats.id_range
+        if ids:
+            stats.id_range = [min(ids), max(ids)]
+        stats.imported += len(imported)
+
+    async def __copy(
+        self,
+        table: str,
+        columns: list[str],
+        records: list[tuple[Any, ...]]
+    ) -> None:
+        '''
+        Загрузка записей через `COPY` в точке сохранения: ошибка \
+            откатывает только эти записи, а не всю транзакцию
+
+        Args:
+            table (str): Название таблицы
+            columns (list[str]): Колонки таблицы
+            records (list[tuple[Any, ...]]): Значения колонок записей
+
+        Raises:
+            RuntimeError: Соединение SQLAlchemy не связано с asyncpg
+            Exception: Ошибка драйвера БД, в том числе нарушение \
+                ограничений таблицы
+        '''
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        if driver_connection is None:
+            raise RuntimeError('Соединение с БД закрыто')
+        async with self.db.begin_nested():
+            await driver_connection.copy_records_to_table(
+                table,
+                records=records,
+                columns=columns
+            )
+
+    async def __commit(
+        self,
+        table: str,
+        state: dict[str, Any],
+        position: int,
+        stats: ImportStats
+    ) -> None:
+        '''
+        Фиксация транзакции и сохранение позиции и диапазона ID \
+            загруженных строк в файле состояния
+
+        Args:
+            table (str): Название таблицы
+            state (dict[str, Any]): Состояние загрузки таблицы
+            position (int): Количество обработанных записей файла
+            stats (ImportStats): Результат загрузки файла
+        '''
+        await self.db.commit()
+        state['position'] = position
+        state['id_range'] = stats.id_range
+        self.checkpoint.save()
+        print(f'{table}: {position} records processed')
+
+    async def __drop_indexes(self, table: str, state: dict[str, Any]) -> None:
+        '''
+        Удаление индексов таблицы, кроме индексов ограничений. \
+            Определения индексов сохраняются в файл состояния до удаления, \
+                поэтому прерванная загрузка построит их при продолжении
+
+        Args:
+            table (str): Название таблицы
+            state (dict[str, Any]): Состояние загрузки таблицы
+        '''
+        if not state['indexes']:
+            result = await self.db.execute(text(
+                'SELECT indexname, indexdef FROM pg_indexes AS i '
+                'WHERE schemaname = current_schema() '
+                'AND tablename = :table '
+                'AND NOT EXISTS ('
+                'SELECT 1 FROM pg_constraint AS c '
+                'WHERE c.conname = i.indexname)'
+            ), {'table': table})
+            state['indexes'] = [list(row) for row in result.all()]
+            self.checkpoint.save()
+
+        for name, _ in state['indexes']:
+            await self.db.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+        await self.db.commit()
+
+    async def __create_indexes(self, state: dict[str, Any]) -> None:
+        '''
+        Построение индексов, удаленных на время загрузки
+
+        Args:
+            state (dict[str, Any]): Состояние загрузки таблицы
+        '''
+        for name, definition in state['indexes']:
+            print(f'Creating index {name}')
+            await self.db.execute(text(definition.replace(
+                'CREATE INDEX', 'CREATE INDEX IF NOT EXISTS', 1
+            )))
+        await self.db.commit()
+        state['indexes'] = []
+        self.checkpoint.save()
+
+    async def __reset_sequence(self, table: str) -> None:
+        '''
+        Сдвиг последовательности ID таблицы за максимальный ID, \
+            так как `COPY` загружает ID записей без обращения к ней
+
+        Args:
+            table (str): Название таблицы
+        '''
+        await self.db.execute(text(
+            f'SELECT setval(pg_get_serial_sequence(:table, \'id\'), '
+            f'coalesce(max(id), 1), max(id) IS NOT NULL) FROM "{table}"'
+        ), {'table': table})
+        await self.db.commit()
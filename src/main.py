@@ -1,20 +1,69 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncGenerator
 from fastapi import APIRouter, FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 
 from article.routers.router import router as article_router
 from comment.routers.router import router as comment_router
+from changes.routers.router import router as changes_router
+from config import settings
+from dependencies.services import redis_service_instance
+from base.http import WeakETagMiddleware
+from db.replicas import ReadPrimaryMiddleware
+from metrics.metrics import monitor_event_loop_lag
+from metrics.middleware import MetricsMiddleware
+from metrics.router import router as metrics_router
+from metrics.timing import ServerTimingMiddleware
+from storage.local_cache import listen_invalidations
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    '''
+    Открывает общие для всех запросов соединения при старте приложения \
+        и закрывает их при остановке
+    '''
+    await redis_service_instance.connect()
+    async with redis_service_instance.client() as client:
+        tasks = [
+            asyncio.create_task(listen_invalidations(client)),
+            asyncio.create_task(monitor_event_loop_lag())
+        ]
+        try:
+            yield
+        finally:
+            for task in tasks:
+                task.cancel()
+            for task in tasks:
+                with suppress(asyncio.CancelledError):
+                    await task
+            await redis_service_instance.disconnect()
 
 
 def get_app(*routers: APIRouter) -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(ReadPrimaryMiddleware)
+    # Уже сжатые ответы не сжимаются повторно
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.compression.compression_min_size,
+        compresslevel=settings.compression.compression_level
+    )
+    # Снаружи GZipMiddleware, чтобы видеть добавленный им Content-Encoding
+    app.add_middleware(WeakETagMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(ServerTimingMiddleware)
 
     for router in routers:
         app.include_router(router, prefix='/api')
+    app.include_router(metrics_router)
 
     return app
 
 
-app = get_app(article_router, comment_router)
+app = get_app(article_router, comment_router, changes_router)
 
 if __name__ == '__main__':
     uvicorn.run(app)
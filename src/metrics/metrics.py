@@ -0,0 +1,214 @@
+import asyncio
+import time
+from typing import Any, Iterator
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from db.pool import get_pool_stats
+from metrics.timing import record_query
+
+# Границы корзин для быстрых операций: запросов в БД и обращений к кэшу
+FAST_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1,
+    2.5, 5
+)
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total',
+    'Количество HTTP-запросов',
+    ['method', 'route', 'status']
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Время обработки HTTP-запроса',
+    ['method', 'route']
+)
+
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Количество обращений к кэшу по ключам. result: local_hit - '
+    'локальный кэш процесса, hit - Redis, miss - загрузка из БД',
+    ['cache', 'result']
+)
+CACHE_DURATION = Histogram(
+    'cache_request_duration_seconds',
+    'Время чтения значений из локального кэша и Redis без загрузки '
+    'при промахе',
+    ['cache', 'operation'],
+    buckets=FAST_BUCKETS
+)
+
+DB_QUERIES = Counter(
+    'db_queries_total',
+    'Количество SQL-запросов',
+    ['database', 'operation']
+)
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds',
+    'Время выполнения SQL-запроса',
+    ['database', 'operation'],
+    buckets=FAST_BUCKETS
+)
+
+EVENT_LOOP_LAG = Gauge(
+    'event_loop_lag_seconds',
+    'Последняя задержка event loop относительно запланированного '
+    'пробуждения'
+)
+EVENT_LOOP_LAG_HISTOGRAM = Histogram(
+    'event_loop_lag_seconds_distribution',
+    'Задержка event loop относительно запланированного пробуждения',
+    buckets=FAST_BUCKETS
+)
+
+SQL_OPERATIONS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'COPY')
+
+# Движки с метриками запросов и пула по названиям БД
+_engines: dict[str, AsyncEngine] = {}
+
+
+def get_sql_operation(statement: str) -> str:
+    '''
+    Тип SQL-запроса для метки метрики
+
+    Args:
+        statement (str): SQL-запрос
+
+    Returns:
+        str: Первое ключевое слово запроса (`SELECT`, `INSERT`, ...) \
+            или `OTHER`
+    '''
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement else ''
+    return keyword if keyword in SQL_OPERATIONS else 'OTHER'
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    '''
+    Подключает к движку метрики количества и времени SQL-запросов \
+        и метрики пула соединений
+
+    Args:
+        engine (AsyncEngine): Асинхронный движок SQLAlchemy
+        name (str): Название БД для метки `database` \
+            (`primary` или хост реплики)
+    '''
+    _engines[name] = engine
+
+    @event.listens_for(engine.sync_engine, 'before_cursor_execute')
+    def before_cursor_execute(
+        conn: Connection, cursor: Any, statement: str, *args: Any
+    ) -> None:
+        conn.info.setdefault('query_started_at', []).append(
+            time.perf_counter()
+        )
+
+    @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+    def after_cursor_execute(
+        conn: Connection, cursor: Any, statement: str, *args: Any
+    ) -> None:
+        seconds = time.perf_counter() - conn.info['query_started_at'].pop()
+        operation = get_sql_operation(statement)
+        DB_QUERIES.labels(name, operation).inc()
+        DB_QUERY_DURATION.labels(name, operation).observe(seconds)
+        record_query(statement, seconds)
+
+    @event.listens_for(engine.sync_engine, 'handle_error')
+    def handle_error(context: Any) -> None:
+        if context.connection is not None:
+            started = context.connection.info.get('query_started_at')
+            if started:
+                started.pop()
+
+
+class PoolCollector(Collector):
+    '''
+    Метрики пулов соединений подключенных движков, читаемые \
+        при каждом сборе метрик
+    '''
+
+    def collect(self) -> Iterator[Any]:
+        labels = ['database']
+        size = GaugeMetricFamily(
+            'db_pool_size', 'Постоянный размер пула', labels=labels
+        )
+        checked_out = GaugeMetricFamily(
+            'db_pool_checked_out', 'Выданные соединения', labels=labels
+        )
+        checked_in = GaugeMetricFamily(
+            'db_pool_checked_in', 'Свободные соединения в пуле',
+            labels=labels
+        )
+        overflow = GaugeMetricFamily(
+            'db_pool_overflow',
+            'Соединения сверх постоянного размера пула',
+            labels=labels
+        )
+        utilization = GaugeMetricFamily(
+            'db_pool_utilization',
+            'Доля выданных соединений от максимума пула с учетом '
+            'max_overflow. 1 - новые запросы ждут соединения',
+            labels=labels
+        )
+        checkouts = CounterMetricFamily(
+            'db_pool_checkouts', 'Количество выдач соединений',
+            labels=labels
+        )
+        timeouts = CounterMetricFamily(
+            'db_pool_timeouts',
+            'Количество выдач, не дождавшихся соединения',
+            labels=labels
+        )
+        wait_seconds = CounterMetricFamily(
+            'db_pool_wait_seconds',
+            'Суммарное время ожидания соединения', labels=labels
+        )
+        wait_seconds_max = GaugeMetricFamily(
+            'db_pool_wait_seconds_max',
+            'Максимальное время ожидания соединения', labels=labels
+        )
+        for name, engine in _engines.items():
+            stats = get_pool_stats(engine)
+            if stats is None:
+                continue
+            capacity = stats.size + max(stats.max_overflow, 0)
+            size.add_metric([name], stats.size)
+            checked_out.add_metric([name], stats.checked_out)
+            checked_in.add_metric([name], stats.checked_in)
+            overflow.add_metric([name], stats.overflow)
+            utilization.add_metric(
+                [name],
+                stats.checked_out / capacity if capacity else 0
+            )
+            checkouts.add_metric([name], stats.checkouts)
+            timeouts.add_metric([name], stats.timeouts)
+            wait_seconds.add_metric([name], stats.wait_seconds_total)
+            wait_seconds_max.add_metric([name], stats.wait_seconds_max)
+        yield from (
+            size, checked_out, checked_in, overflow, utilization,
+            checkouts, timeouts, wait_seconds, wait_seconds_max
+        )
+
+
+REGISTRY.register(PoolCollector())
+
+
+async def monitor_event_loop_lag(interval_seconds: float = 0.5) -> None:
+    '''
+    Бесконечно измеряет задержку event loop: на сколько позже \
+        запланированного просыпается `asyncio.sleep`. Большая задержка \
+            означает блокирующий код или нехватку CPU
+
+    Args:
+        interval_seconds (float, optional): Интервал измерений. \
+            Defaults to 0.5.
+    '''
+    loop = asyncio.get_running_loop()
+    while True:
+        started_at = loop.time()
+        await asyncio.sleep(interval_seconds)
+        lag = max(0.0, loop.time() - started_at - interval_seconds)
+        EVENT_LOOP_LAG.set(lag)
+        EVENT_LOOP_LAG_HISTOGRAM.observe(lag)
@@ -0,0 +1,41 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from metrics.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+
+# Метка запросов, не совпавших ни с одним маршрутом. Пути таких запросов
+# не используются как метки, чтобы количество рядов метрик не росло
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class MetricsMiddleware:
+    '''
+    Считает HTTP-запросы и время их обработки по шаблонам маршрутов \
+        (`/api/articles/{article_id}`), а не по путям запросов
+    '''
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started_at = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            route_path = getattr(route, 'path', UNMATCHED_ROUTE)
+            HTTP_REQUESTS.labels(scope['method'], route_path, status).inc()
+            HTTP_REQUEST_DURATION.labels(scope['method'], route_path).observe(
+                time.perf_counter() - started_at
+            )
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+router = APIRouter(tags=['Метрики'])
+
+
+@router.get(
+    path='/metrics',
+    summary='Метрики Prometheus',
+    description='Метрики процесса в текстовом формате Prometheus: '
+    'HTTP-запросы, кэш, запросы и пул соединений БД, задержка event loop',
+    response_class=Response
+)
+async def get_metrics():
+    return Response(
+        generate_latest(REGISTRY),
+        media_type=CONTENT_TYPE_LATEST
+    )
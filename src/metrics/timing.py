@@ -0,0 +1,193 @@
+import functools
+import inspect
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Списки параметров `IN ($1, $2, ...)` разной длины - один вид запроса
+_PARAM = r'(?:\$\d+|%\(\w+\)s|\?)'
+_PARAMS_LIST_RE = re.compile(rf'\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+@dataclass
+class RequestTimings:
+    '''
+    Время, потраченное запросом на БД, Redis и сериализацию ответа
+
+    Args:
+        path (str): Путь запроса для логов
+        started_at (float): Время начала запроса по `time.perf_counter()`
+        db_seconds (float): Суммарное время SQL-запросов
+        db_queries (int): Количество SQL-запросов
+        redis_seconds (float): Суммарное время команд Redis
+        redis_commands (int): Количество обращений к Redis \
+            (пакет команд - одно обращение)
+        handler_finished_at (float | None): Время завершения обработчика \
+            маршрута, после которого начинается сериализация ответа
+        statements (Counter[str]): Количество выполнений SQL-запросов \
+            по видам (только в режиме отладки)
+    '''
+    path: str
+    started_at: float = field(default_factory=time.perf_counter)
+    db_seconds: float = 0.0
+    db_queries: int = 0
+    redis_seconds: float = 0.0
+    redis_commands: int = 0
+    handler_finished_at: float | None = None
+    statements: Counter[str] = field(default_factory=Counter)
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar(
+    'request_timings',
+    default=None
+)
+
+
+def get_statement_shape(statement: str) -> str:
+    '''
+    Вид SQL-запроса без различий в пробелах и длине списков параметров
+
+    Args:
+        statement (str): SQL-запрос
+
+    Returns:
+        str: Нормализованный SQL-запрос
+    '''
+    statement = _WHITESPACE_RE.sub(' ', statement).strip()
+    return _PARAMS_LIST_RE.sub('(...)', statement)
+
+
+def record_query(statement: str, seconds: float) -> None:
+    '''
+    Учитывает SQL-запрос в таймингах текущего HTTP-запроса. В режиме \
+        отладки предупреждает, если один вид запроса выполняется \
+            больше `n_plus_one_threshold` раз (признак N+1)
+
+    Args:
+        statement (str): SQL-запрос
+        seconds (float): Время выполнения
+    '''
+    timings = request_timings.get()
+    if timings is None:
+        return
+    timings.db_seconds += seconds
+    timings.db_queries += 1
+    if not settings.debug:
+        return
+    shape = get_statement_shape(statement)
+    timings.statements[shape] += 1
+    if timings.statements[shape] == settings.timing.n_plus_one_threshold + 1:
+        logger.warning(
+            'Possible N+1: %s runs the same statement more than %s times: %s',
+            timings.path,
+            settings.timing.n_plus_one_threshold,
+            shape
+        )
+
+
+def record_redis(seconds: float) -> None:
+    '''
+    Учитывает обращение к Redis в таймингах текущего HTTP-запроса
+
+    Args:
+        seconds (float): Время обращения
+    '''
+    timings = request_timings.get()
+    if timings is not None:
+        timings.redis_seconds += seconds
+        timings.redis_commands += 1
+
+
+def format_server_timing(timings: RequestTimings, now: float) -> str:
+    '''
+    Значение заголовка `Server-Timing`
+
+    Args:
+        timings (RequestTimings): Тайминги запроса
+        now (float): Время начала ответа по `time.perf_counter()`
+
+    Returns:
+        str: Значение заголовка `Server-Timing` с длительностями \
+            в миллисекундах
+    '''
+    metrics = [
+        f'db;dur={timings.db_seconds * 1000:.1f};'
+        f'desc="{timings.db_queries} queries"',
+        f'redis;dur={timings.redis_seconds * 1000:.1f};'
+        f'desc="{timings.redis_commands} calls"',
+    ]
+    if timings.handler_finished_at is not None:
+        serialize_seconds = now - timings.handler_finished_at
+        metrics.append(f'serialize;dur={serialize_seconds * 1000:.1f}')
+    metrics.append(f'total;dur={(now - timings.started_at) * 1000:.1f}')
+    return ', '.join(metrics)
+
+
+class TimedRoute(APIRoute):
+    '''
+    Маршрут, отмечающий в таймингах запроса завершение обработчика. \
+        Время от завершения обработчика до начала ответа - валидация \
+            и сериализация ответа
+    '''
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            super().__init__(path, endpoint, **kwargs)
+            return
+
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timings = request_timings.get()
+                if timings is not None:
+                    timings.handler_finished_at = time.perf_counter()
+
+        super().__init__(path, timed_endpoint, **kwargs)
+
+
+class ServerTimingMiddleware:
+    '''
+    Собирает тайминги каждого HTTP-запроса и отдает их в заголовке \
+        `Server-Timing`: время SQL-запросов, команд Redis, сериализации \
+            ответа и общее время до начала ответа
+    '''
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(path=scope['path'])
+        token = request_timings.set(timings)
+
+        async def send_with_timing(message: Message) -> None:
+            if (
+                message['type'] == 'http.response.start'
+                and settings.timing.server_timing
+            ):
+                MutableHeaders(scope=message).append(
+                    'Server-Timing',
+                    format_server_timing(timings, time.perf_counter())
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
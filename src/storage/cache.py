@@ -0,0 +1,608 @@
+import asyncio
+import base64
+import gzip
+import hashlib
+import logging
+import secrets
+import time
+from typing import Awaitable, Callable
+import redis.asyncio as redis
+from config import settings
+from storage.local_cache import (
+    INVALIDATION_CHANNEL, LocalCache, get_local_cache, invalidate_local
+)
+from storage.redis import pipeline
+from metrics.metrics import CACHE_DURATION, CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[str]]
+ManyLoader = Callable[[list[str]], Awaitable[dict[str, str]]]
+
+# Загрузки, выполняемые сейчас в этом процессе, по ключам кэша
+_inflight: dict[str, asyncio.Future[str]] = {}
+# Фоновые обновления устаревших значений по ключам кэша
+_refreshing: dict[str, asyncio.Task[None]] = {}
+
+# Сохраняет значение, его хэш и сжатый вариант, только если версия ключа
+# не изменилась с момента, когда значение начали загружать. Иначе значение
+# могло устареть. Пустой сжатый вариант - значение не сжимается
+_SET_IF_VERSION_SCRIPT = '''
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+redis.call('SET', KEYS[3], ARGV[4], 'EX', ARGV[3])
+if ARGV[5] ~= '' then
+    redis.call('SET', KEYS[4], ARGV[5], 'EX', ARGV[3])
+else
+    redis.call('DEL', KEYS[4])
+end
+return 1
+'''
+
+# Снимает блокировку, только если она все еще принадлежит владельцу
+_RELEASE_LOCK_SCRIPT = '''
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+'''
+
+
+def digest(value: str) -> str:
+    '''
+    Хэш значения кэша. Хранится рядом со значением, чтобы проверять \
+        актуальность значения у клиента без чтения самого значения
+
+    Args:
+        value (str): Значение
+
+    Returns:
+        str: Хэш значения в виде hex-строки
+    '''
+    return hashlib.blake2b(value.encode('utf8'), digest_size=16).hexdigest()
+
+
+def compress(value: str) -> str:
+    '''
+    Сжатый gzip вариант значения кэша. Клиент Redis декодирует ответы \
+        как строки, поэтому сжатые байты хранятся в base64
+
+    Args:
+        value (str): Значение
+
+    Returns:
+        str: Сжатое значение в base64 или пустая строка, если значение \
+            меньше `compression_min_size` и не сжимается
+    '''
+    raw = value.encode('utf8')
+    if len(raw) < settings.compression.compression_min_size:
+        return ''
+    compressed = gzip.compress(
+        raw,
+        compresslevel=settings.compression.compression_level,
+        mtime=0
+    )
+    return base64.b64encode(compressed).decode('ascii')
+
+
+class RedisCache:
+    '''
+    Кэш строковых значений в Redis с локальным кэшем процесса \
+        первого уровня.
+
+    При промахе значение загружается только одним запросом: внутри \
+        процесса остальные запросы ждут ту же загрузку, а между воркерами \
+            загрузку защищает короткая блокировка в Redis. В режиме \
+                stale-while-revalidate значение старше мягкого TTL \
+                    продолжает отдаваться, пока одна фоновая задача \
+                        его обновляет. Жесткий TTL ограничивает время \
+                            жизни значения в Redis.
+
+    У каждого ключа есть версия, которая увеличивается при инвалидации. \
+        Загруженное значение сохраняется, только если версия не изменилась \
+            за время загрузки, поэтому запрос, прочитавший данные до \
+                изменения, не может вернуть их в кэш после инвалидации.
+
+    Вместе со значением сохраняется его хэш (`digest`), по которому \
+        можно проверить актуальность копии клиента без чтения значения, \
+            и сжатый gzip вариант (`compress`), который отдается клиентам \
+                без сжатия на каждый запрос
+    '''
+
+    _lock_poll_interval_seconds = 0.05
+    _version_ttl_seconds = 7 * 24 * 60 * 60
+
+    def __init__(self, client: redis.Redis, name: str) -> None:
+        '''
+        Кэш строковых значений в Redis
+
+        Args:
+            client (redis.Redis): Клиент Redis
+            name (str): Название кэша, совпадающее с префиксом ключей
+        '''
+        self.client = client
+        self.name = name
+        self.local_cache: LocalCache = get_local_cache(name)
+        self.soft_ttl_seconds = settings.cache.cache_soft_ttl_seconds
+        self.hard_ttl_seconds = settings.cache.cache_hard_ttl_seconds
+        self.stale_while_revalidate = (
+            settings.cache.cache_stale_while_revalidate
+        )
+        self.lock_ttl_seconds = settings.cache.cache_lock_ttl_seconds
+        self.__release_lock = client.register_script(_RELEASE_LOCK_SCRIPT)
+        self.__set_if_version = client.register_script(
+            _SET_IF_VERSION_SCRIPT
+        )
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Loader,
+        refresher: Loader | None = None
+    ) -> str:
+        '''
+        Получение значения из кэша с загрузкой при промахе
+
+        Args:
+            key (str): Ключ
+            loader (Loader): Загрузка значения при промахе
+            refresher (Loader | None, optional): Загрузка значения в фоне \
+                для режима stale-while-revalidate. Не должна зависеть от \
+                    ресурсов запроса (например, сессии БД). \
+                        Defaults to None - устаревшие значения не обновляются \
+                            до истечения жесткого TTL.
+
+        Returns:
+            str: Значение
+        '''
+        # Время загрузки при промахе учитывается метриками БД
+        started_at = time.perf_counter()
+        value = self.local_cache.get(key)
+        if value is not None:
+            self.__observe_duration('get', started_at)
+            CACHE_REQUESTS.labels(self.name, 'local_hit').inc()
+            return value
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            pipe.get(self.__get_version_key(key))
+            value, ttl_ms, version = await pipe.execute()
+        self.__observe_duration('get', started_at)
+
+        if value is None:
+            CACHE_REQUESTS.labels(self.name, 'miss').inc()
+            return await self.__load_once(key, loader, version or '0')
+
+        CACHE_REQUESTS.labels(self.name, 'hit').inc()
+        self.local_cache.set(key, value)
+        if refresher is not None and self.__is_stale(ttl_ms):
+            self.__refresh_in_background(key, refresher)
+        return value
+
+    async def get_many_or_load(
+        self,
+        keys: list[str],
+        loader: ManyLoader
+    ) -> dict[str, str]:
+        '''
+        Получение нескольких значений из кэша. Промахи локального кэша \
+            читаются из Redis одним `MGET`, промахи Redis загружаются \
+                одним вызовом `loader` и записываются обратно одним пакетом
+
+        Args:
+            keys (list[str]): Ключи
+            loader (ManyLoader): Загрузка значений по списку ключей. \
+                Возвращает значения по ключам, ненайденные ключи пропускает
+
+        Returns:
+            dict[str, str]: Значения по ключам. Ненайденные ключи \
+                отсутствуют
+        '''
+        # Время загрузки промахов учитывается метриками БД
+        started_at = time.perf_counter()
+        values: dict[str, str] = {}
+        for key in dict.fromkeys(keys):
+            value = self.local_cache.get(key)
+            if value is not None:
+                values[key] = value
+        CACHE_REQUESTS.labels(self.name, 'local_hit').inc(len(values))
+        remote_keys = [
+            key for key in dict.fromkeys(keys) if key not in values
+        ]
+        if not remote_keys:
+            self.__observe_duration('get_many', started_at)
+            return values
+
+        version_keys = [
+            self.__get_version_key(key) for key in remote_keys
+        ]
+        results = await self.client.mget(remote_keys + version_keys)
+        self.__observe_duration('get_many', started_at)
+        versions: dict[str, str] = {}
+        for i, key in enumerate(remote_keys):
+            value, version = results[i], results[len(remote_keys) + i]
+            if value is not None:
+                values[key] = value
+                self.local_cache.set(key, value)
+            else:
+                versions[key] = version or '0'
+        CACHE_REQUESTS.labels(self.name, 'hit').inc(
+            len(remote_keys) - len(versions)
+        )
+        CACHE_REQUESTS.labels(self.name, 'miss').inc(len(versions))
+        if not versions:
+            return values
+
+        loaded = await loader(list(versions))
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in loaded.items():
+                await self.__set_if_version(
+                    keys=self.__get_versioned_keys(key),
+                    args=[
+                        versions[key],
+                        value,
+                        self.__redis_ttl_seconds(),
+                        digest(value),
+                        compress(value)
+                    ],
+                    client=pipe
+                )
+            stored = await pipe.execute()
+        for (key, value), is_stored in zip(loaded.items(), stored):
+            values[key] = value
+            if is_stored:
+                self.local_cache.set(key, value)
+                self.local_cache.delete(self.__get_compressed_key(key))
+        return values
+
+    async def set(self, key: str, value: str) -> None:
+        '''
+        Сохранение значения в Redis и в локальный кэш процесса
+
+        Args:
+            key (str): Ключ
+            value (str): Значение
+        '''
+        ttl_seconds = self.__redis_ttl_seconds()
+        compressed = compress(value)
+        async with pipeline(self.client, transaction=True) as pipe:
+            pipe.set(key, value, ex=ttl_seconds)
+            pipe.set(self.__get_digest_key(key), digest(value), ex=ttl_seconds)
+            if compressed:
+                pipe.set(
+                    self.__get_compressed_key(key),
+                    compressed,
+                    ex=ttl_seconds
+                )
+            else:
+                pipe.delete(self.__get_compressed_key(key))
+        self.local_cache.set(key, value)
+        self.local_cache.delete(self.__get_compressed_key(key))
+
+    async def get_digest(self, key: str) -> str | None:
+        '''
+        Получение хэша значения без чтения самого значения из Redis
+
+        Args:
+            key (str): Ключ
+
+        Returns:
+            str | None: Хэш значения или `None`, если значения нет в кэше
+        '''
+        value = self.local_cache.get(key)
+        if value is not None:
+            return digest(value)
+        return await self.client.get(self.__get_digest_key(key))
+
+    async def get_compressed(self, key: str) -> bytes | None:
+        '''
+        Получение сжатого gzip варианта значения без сжатия \
+            на каждый запрос
+
+        Args:
+            key (str): Ключ значения
+
+        Returns:
+            bytes | None: Сжатое значение или `None`, если значения нет \
+                в кэше или оно слишком маленькое для сжатия
+        '''
+        compressed_key = self.__get_compressed_key(key)
+        value = self.local_cache.get(compressed_key)
+        if value is not None:
+            return value
+        encoded = await self.client.get(compressed_key)
+        if encoded is None:
+            return None
+        value = base64.b64decode(encoded)
+        self.local_cache.set(compressed_key, value)
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        '''
+        Удаление значения из Redis и из локальных кэшей всех воркеров \
+            с увеличением версии ключа. Должно вызываться после фиксации \
+                изменения в БД
+
+        Args:
+            key (str): Ключ
+        '''
+        await self.invalidate_many([key])
+
+    async def invalidate_many(self, keys: list[str]) -> None:
+        '''
+        Инвалидация нескольких значений одним пакетом команд Redis
+
+        Args:
+            keys (list[str]): Ключи
+        '''
+        if not keys:
+            return
+        async with pipeline(self.client) as pipe:
+            for key in keys:
+                compressed_key = self.__get_compressed_key(key)
+                invalidate_local(key)
+                invalidate_local(compressed_key)
+                version_key = self.__get_version_key(key)
+                pipe.incr(version_key)
+                pipe.expire(version_key, self._version_ttl_seconds)
+                pipe.delete(key, self.__get_digest_key(key), compressed_key)
+                pipe.publish(INVALIDATION_CHANNEL, key)
+                pipe.publish(INVALIDATION_CHANNEL, compressed_key)
+
+    def __observe_duration(self, operation: str, started_at: float) -> None:
+        '''
+        Учет времени чтения из локального кэша и Redis
+
+        Args:
+            operation (str): Операция кэша
+            started_at (float): Время начала операции по `perf_counter`
+        '''
+        CACHE_DURATION.labels(self.name, operation).observe(
+            time.perf_counter() - started_at
+        )
+
+    async def __set_versioned(
+        self,
+        key: str,
+        value: str,
+        version: str
+    ) -> None:
+        '''
+        Сохранение загруженного значения, если версия ключа не изменилась
+
+        Args:
+            key (str): Ключ
+            value (str): Значение
+            version (str): Версия ключа до начала загрузки
+        '''
+        stored = await self.__set_if_version(
+            keys=self.__get_versioned_keys(key),
+            args=[
+                version,
+                value,
+                self.__redis_ttl_seconds(),
+                digest(value),
+                compress(value)
+            ]
+        )
+        if stored:
+            self.local_cache.set(key, value)
+            self.local_cache.delete(self.__get_compressed_key(key))
+
+    def __get_version_key(self, key: str) -> str:
+        '''
+        Получение ключа версии значения
+
+        Args:
+            key (str): Ключ значения
+
+        Returns:
+            str: Ключ вида `ключ:version`
+        '''
+        return f'{key}:version'
+
+    def __get_digest_key(self, key: str) -> str:
+        '''
+        Получение ключа хэша значения
+
+        Args:
+            key (str): Ключ значения
+
+        Returns:
+            str: Ключ вида `ключ:digest`
+        '''
+        return f'{key}:digest'
+
+    def __get_compressed_key(self, key: str) -> str:
+        '''
+        Получение ключа сжатого варианта значения
+
+        Args:
+            key (str): Ключ значения
+
+        Returns:
+            str: Ключ вида `ключ:gzip`
+        '''
+        return f'{key}:gzip'
+
+    def __get_versioned_keys(self, key: str) -> list[str]:
+        '''
+        Ключи для скрипта сохранения значения с проверкой версии
+
+        Args:
+            key (str): Ключ значения
+
+        Returns:
+            list[str]: Ключи значения, версии, хэша и сжатого варианта \
+                значения
+        '''
+        return [
+            key,
+            self.__get_version_key(key),
+            self.__get_digest_key(key),
+            self.__get_compressed_key(key)
+        ]
+
+    def __redis_ttl_seconds(self) -> int:
+        '''
+        Время жизни значения в Redis
+
+        Returns:
+            int: Жесткий TTL в режиме stale-while-revalidate, иначе мягкий
+        '''
+        if self.stale_while_revalidate:
+            return self.hard_ttl_seconds
+        return self.soft_ttl_seconds
+
+    def __is_stale(self, ttl_ms: int) -> bool:
+        '''
+        Проверка, что значение старше мягкого TTL
+
+        Args:
+            ttl_ms (int): Оставшееся время жизни значения в Redis \
+                в миллисекундах
+
+        Returns:
+            bool: `True` - значение нужно обновить
+        '''
+        if not self.stale_while_revalidate or ttl_ms < 0:
+            return False
+        age_seconds = self.hard_ttl_seconds - ttl_ms / 1000
+        return age_seconds >= self.soft_ttl_seconds
+
+    async def __load_once(
+        self,
+        key: str,
+        loader: Loader,
+        version: str
+    ) -> str:
+        '''
+        Загрузка значения при промахе, одна на процесс. \
+            Одновременные запросы того же ключа ждут ее результат
+
+        Args:
+            key (str): Ключ
+            loader (Loader): Загрузка значения
+            version (str): Версия ключа до начала загрузки
+
+        Returns:
+            str: Значение
+        '''
+        future = _inflight.get(key)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Отменен запрос, выполнявший загрузку, а не текущий
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(
+            lambda f: f.cancelled() or f.exception()
+        )
+        _inflight[key] = future
+        try:
+            value = await self.__load_locked(key, loader, version)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            _inflight.pop(key, None)
+
+    async def __load_locked(
+        self,
+        key: str,
+        loader: Loader,
+        version: str
+    ) -> str:
+        '''
+        Загрузка значения под блокировкой в Redis. Если значение уже \
+            загружает другой воркер, дожидается его результата
+
+        Args:
+            key (str): Ключ
+            loader (Loader): Загрузка значения
+            version (str): Версия ключа до начала загрузки
+
+        Returns:
+            str: Значение
+        '''
+        lock_key = f'lock:{key}'
+        token = secrets.token_hex(8)
+        lock_ttl_ms = int(self.lock_ttl_seconds * 1000)
+        if await self.client.set(lock_key, token, nx=True, px=lock_ttl_ms):
+            try:
+                value = await loader()
+                await self.__set_versioned(key, value, version)
+                return value
+            finally:
+                await self.__release_lock(keys=[lock_key], args=[token])
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl_seconds
+        while loop.time() < deadline:
+            await asyncio.sleep(self._lock_poll_interval_seconds)
+            value, lock = await self.client.mget(key, lock_key)
+            if value is not None:
+                self.local_cache.set(key, value)
+                return value
+            if lock is None:
+                break
+
+        value = await loader()
+        await self.__set_versioned(key, value, version)
+        return value
+
+    def __refresh_in_background(self, key: str, refresher: Loader) -> None:
+        '''
+        Запуск фонового обновления значения, если оно еще не запущено \
+            в этом процессе
+
+        Args:
+            key (str): Ключ
+            refresher (Loader): Загрузка значения
+        '''
+        if key in _refreshing:
+            return
+        task = asyncio.create_task(self.__refresh(key, refresher))
+        _refreshing[key] = task
+        task.add_done_callback(lambda _: _refreshing.pop(key, None))
+
+    async def __refresh(self, key: str, refresher: Loader) -> None:
+        '''
+        Обновление значения под блокировкой в Redis. Если блокировка \
+            занята, значение уже обновляет другой воркер
+
+        Args:
+            key (str): Ключ
+            refresher (Loader): Загрузка значения
+        '''
+        lock_key = f'lock:{key}'
+        token = secrets.token_hex(8)
+        lock_ttl_ms = int(self.lock_ttl_seconds * 1000)
+        try:
+            if not await self.client.set(
+                lock_key, token, nx=True, px=lock_ttl_ms
+            ):
+                return
+            try:
+                version = await self.client.get(self.__get_version_key(key))
+                await self.__set_versioned(
+                    key,
+                    await refresher(),
+                    version or '0'
+                )
+            finally:
+                await self.__release_lock(keys=[lock_key], args=[token])
+        except Exception:
+            logger.exception('Failed to refresh cached value %s', key)
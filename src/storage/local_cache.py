@@ -0,0 +1,214 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from config import settings
+
+INVALIDATION_CHANNEL = 'cache:invalidate'
+
+
+@dataclass
+class LocalCacheStats:
+    '''
+    Счетчики локального кэша
+
+    Args:
+        name (str): Название кэша
+        size (int): Текущее количество записей
+        max_size (int): Максимальное количество записей
+        hits (int): Количество попаданий
+        misses (int): Количество промахов
+        evictions (int): Количество вытесненных по LRU записей
+        expirations (int): Количество записей, удаленных по TTL
+        invalidations (int): Количество записей, удаленных при инвалидации
+    '''
+    name: str
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class LocalCache:
+    '''
+    Ограниченный по размеру LRU-кэш с TTL в памяти процесса. \
+        Используется как первый уровень перед Redis
+    '''
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float) -> None:
+        '''
+        Ограниченный по размеру LRU-кэш с TTL в памяти процесса
+
+        Args:
+            name (str): Название кэша
+            max_size (int): Максимальное количество записей
+            ttl_seconds (float): Время жизни записи в секундах
+        '''
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.__entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Any | None:
+        '''
+        Получение значения по ключу
+
+        Args:
+            key (str): Ключ
+
+        Returns:
+            Any | None: Значение или `None`, если ключ не найден \
+                или устарел
+        '''
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.__entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        '''
+        Сохранение значения по ключу. При переполнении вытесняется \
+            давно не использованная запись
+
+        Args:
+            key (str): Ключ
+            value (Any): Значение
+        '''
+        if self.max_size <= 0:
+            return
+        self.__entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        '''
+        Удаление значения по ключу
+
+        Args:
+            key (str): Ключ
+        '''
+        if self.__entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        '''
+        Удаление всех значений
+        '''
+        self.invalidations += len(self.__entries)
+        self.__entries.clear()
+
+    def stats(self) -> LocalCacheStats:
+        '''
+        Счетчики кэша
+
+        Returns:
+            LocalCacheStats: Счетчики кэша
+        '''
+        return LocalCacheStats(
+            name=self.name,
+            size=len(self.__entries),
+            max_size=self.max_size,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            invalidations=self.invalidations
+        )
+
+
+local_caches: dict[str, LocalCache] = {}
+
+
+def get_local_cache(name: str) -> LocalCache:
+    '''
+    Получение локального кэша процесса по названию. \
+        Кэш создается при первом обращении
+
+    Args:
+        name (str): Название кэша, совпадающее с префиксом ключей Redis \
+            (например, `article` для ключей `article:id`)
+
+    Returns:
+        LocalCache: Локальный кэш
+    '''
+    if name not in local_caches:
+        local_caches[name] = LocalCache(
+            name,
+            max_size=settings.cache.cache_local_max_size,
+            ttl_seconds=settings.cache.cache_local_ttl_seconds
+        )
+    return local_caches[name]
+
+
+def invalidate_local(key: str) -> None:
+    '''
+    Удаление ключа из локального кэша, которому он принадлежит
+
+    Args:
+        key (str): Ключ вида `название_кэша:...`
+    '''
+    cache = local_caches.get(key.split(':', 1)[0])
+    if cache is not None:
+        cache.delete(key)
+
+
+async def listen_invalidations(
+    client: redis.Redis,
+    retry_delay_seconds: float = 1,
+    poll_seconds: float = 1
+) -> None:
+    '''
+    Бесконечно слушает канал инвалидаций и удаляет ключи из локальных \
+        кэшей процесса. После переподключения локальные кэши очищаются \
+            целиком, так как инвалидации, опубликованные без подписки, \
+                пропущены
+
+    Args:
+        client (redis.Redis): Клиент Redis
+        retry_delay_seconds (float, optional): Пауза перед \
+            переподключением. Defaults to 1.
+        poll_seconds (float, optional): Время ожидания одного сообщения. \
+            Заменяет `socket_timeout` пула при чтении, поэтому тишина \
+                в канале не считается потерей соединения. Defaults to 1.
+    '''
+    reconnected = False
+    while True:
+        try:
+            async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                if reconnected:
+                    for cache in local_caches.values():
+                        cache.clear()
+                    reconnected = False
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=poll_seconds
+                    )
+                    if message is not None:
+                        invalidate_local(message['data'])
+        except (RedisError, OSError):
+            reconnected = True
+            await asyncio.sleep(retry_delay_seconds)
@@ -1,7 +1,49 @@
-from typing import AsyncGenerator
+import time
+from typing import Any, AsyncGenerator
 from config import settings
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
 from contextlib import asynccontextmanager
+from metrics.timing import record_redis
+
+
+class InstrumentedPipeline(Pipeline):
+    '''
+    Пакет команд Redis, учитывающий время выполнения в таймингах запроса
+    '''
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        started_at = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            record_redis(time.perf_counter() - started_at)
+
+
+class InstrumentedRedis(redis.Redis):
+    '''
+    Клиент Redis, учитывающий время команд и пакетов команд \
+        в таймингах запроса
+    '''
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            record_redis(time.perf_counter() - started_at)
+
+    def pipeline(
+        self,
+        transaction: bool = True,
+        shard_hint: str | None = None
+    ) -> InstrumentedPipeline:
+        return InstrumentedPipeline(
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint
+        )
 
 
 class RedisService:
@@ -11,6 +53,49 @@ class RedisService:
         self.__url = f'redis://{host}:{port}'
         self.__encoding = 'utf8'
         self.__decode_responses = True
+        self.__pool: redis.BlockingConnectionPool | None = None
+
+    @property
+    def pool(self) -> redis.BlockingConnectionPool:
+        '''
+        Общий для всех запросов пул соединений с Redis. \
+            Создается при первом обращении, если не был создан в `connect`
+
+        Returns:
+            redis.BlockingConnectionPool: Пул соединений
+        '''
+        if self.__pool is None:
+            self.__pool = redis.BlockingConnectionPool.from_url(
+                self.__url,
+                encoding=self.__encoding,
+                decode_responses=self.__decode_responses,
+                max_connections=settings.redis.redis_max_connections,
+                timeout=settings.redis.redis_pool_timeout,
+                socket_timeout=settings.redis.redis_socket_timeout,
+                socket_connect_timeout=(
+                    settings.redis.redis_socket_connect_timeout
+                ),
+                health_check_interval=(
+                    settings.redis.redis_health_check_interval
+                )
+            )
+        return self.__pool
+
+    async def connect(self) -> None:
+        '''
+        Создает пул соединений и проверяет доступность Redis. \
+            Вызывается при старте приложения
+        '''
+        async with self.client() as client:
+            await client.ping()
+
+    async def disconnect(self) -> None:
+        '''
+        Закрывает все соединения пула. Вызывается при остановке приложения
+        '''
+        if self.__pool is not None:
+            await self.__pool.aclose()
+            self.__pool = None
 
     @asynccontextmanager
     async def client(self) -> AsyncGenerator[redis.Redis, None]:
@@ -19,17 +104,90 @@ class RedisService:
 
         Yields:
             Iterator[AsyncGenerator[redis.Redis, None]]: Клиент \
-                Redis-сервиса, подключающийся к сервису после каждого \
-                    его вызова
+                Redis-сервиса, берущий соединения из общего пула. \
+                    Закрытие клиента не закрывает пул
         '''
-        pool = redis.ConnectionPool.from_url(
-            self.__url,
-            encoding=self.__encoding,
-            decode_responses=self.__decode_responses
-        )
-
-        _client = redis.Redis.from_pool(pool)
+        _client = InstrumentedRedis(connection_pool=self.pool)
         try:
             yield _client
         finally:
             await _client.aclose()
+
+
+@asynccontextmanager
+async def pipeline(
+    client: redis.Redis,
+    transaction: bool = False
+) -> AsyncGenerator[Pipeline, None]:
+    '''
+    Пакет команд Redis, отправляемый за один сетевой вызов \
+        при выходе из контекста
+
+    Args:
+        client (redis.Redis): Клиент Redis
+        transaction (bool, optional): Выполнить пакет в `MULTI`/`EXEC`. \
+            Defaults to False.
+
+    Yields:
+        Iterator[AsyncGenerator[Pipeline, None]]: Пакет команд
+    '''
+    async with client.pipeline(transaction=transaction) as pipe:
+        yield pipe
+        await pipe.execute()
+
+
+async def get_many(
+    client: redis.Redis,
+    keys: list[str]
+) -> list[str | None]:
+    '''
+    Получение значений нескольких ключей за один сетевой вызов
+
+    Args:
+        client (redis.Redis): Клиент Redis
+        keys (list[str]): Ключи
+
+    Returns:
+        list[str | None]: Значения в порядке `keys`, \
+            `None` - ключ не найден
+    '''
+    if not keys:
+        return []
+    return await client.mget(keys)
+
+
+async def set_many(
+    client: redis.Redis,
+    mapping: dict[str, str],
+    expire_time_seconds: int = 0
+) -> None:
+    '''
+    Запись значений нескольких ключей за один сетевой вызов
+
+    Args:
+        client (redis.Redis): Клиент Redis
+        mapping (dict[str, str]): Значения по ключам
+        expire_time_seconds (int, optional): Время жизни ключей. \
+            Если `expire_time_seconds <= 0`, то время жизни бесконечно. \
+                Defaults to 0.
+    '''
+    if not mapping:
+        return
+    if expire_time_seconds <= 0:
+        await client.mset(mapping)
+        return
+    async with pipeline(client) as pipe:
+        for key, value in mapping.items():
+            pipe.set(key, value, ex=expire_time_seconds)
+
+
+async def delete_many(client: redis.Redis, keys: list[str]) -> None:
+    '''
+    Удаление нескольких ключей за один сетевой вызов
+
+    Args:
+        client (redis.Redis): Клиент Redis
+        keys (list[str]): Ключи
+    '''
+    if keys:
+        await client.delete(*keys)